@@ -3,7 +3,6 @@ AI Alert Suggestions endpoint.
 
 POST /api/ai/alert-suggestions — generate technical price alert suggestions
 """
-import asyncio
 import json
 import logging
 import re
@@ -95,16 +94,16 @@ async def generate_alert_suggestions(
         suggestions = [AlertSuggestion(**s) for s in json.loads(cached)]
         return AlertSuggestionsResponse(suggestions=suggestions, cached=True)
 
-    # Fetch technical data in parallel
-    tech_tasks = [market_service.get_technical_indicators(ticker, "3mo") for ticker in tickers]
-    tech_results = await asyncio.gather(*tech_tasks, return_exceptions=True)
+    # Fetch technical data for all tickers in one batch
+    tech_by_ticker = await market_service.get_technical_indicators_batch(tickers, "3mo")
 
     # Build prompt context
     from app.ai.prompts.alert_suggestions_prompt import SYSTEM_PROMPT, format_stock_context, build_user_prompt
 
     stock_contexts = []
-    for ticker, tech_data in zip(tickers, tech_results):
-        if isinstance(tech_data, Exception) or not tech_data:
+    for ticker in tickers:
+        tech_data = tech_by_ticker.get(ticker)
+        if not tech_data:
             logger.warning(f"No tech data for {ticker}, skipping")
             continue
         ctx = format_stock_context(ticker, tech_data)
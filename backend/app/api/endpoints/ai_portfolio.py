@@ -145,18 +145,26 @@ async def generate_portfolio_advisor(
     # Fetch quotes + tech indicators + macro context in parallel
     year = date.today().year
     quotes_task = market_service.get_quotes(tickers)
-    tech_tasks = [market_service.get_technical_indicators(ticker, "3mo") for ticker in tickers]
+    tech_task = market_service.get_technical_indicators_batch(tickers, "3mo")
     macro_task = tavily_client.search(
         f"Federal Reserve interest rates S&P 500 stock market outlook {year}", max_results=3, days=30
     )
 
-    results = await asyncio.gather(quotes_task, *tech_tasks, macro_task, return_exceptions=True)
-    quotes: dict = results[0] if not isinstance(results[0], Exception) else {}
-    macro_results = results[-1] if not isinstance(results[-1], Exception) else []
+    quotes, tech_results, macro_results = await asyncio.gather(
+        quotes_task, tech_task, macro_task, return_exceptions=True
+    )
+    if isinstance(quotes, Exception):
+        quotes = {}
+    if isinstance(macro_results, Exception):
+        macro_results = []
+    if isinstance(tech_results, Exception):
+        logger.warning(f"Technical batch failed: {tech_results}")
+        tech_results = {}
 
     tech_data: dict[str, dict] = {}
-    for ticker, result in zip(tickers, results[1:-1]):
-        if isinstance(result, Exception) or not result:
+    for ticker in tickers:
+        result = tech_results.get(ticker)
+        if not result:
             logger.warning(f"No tech data for {ticker}")
         else:
             tech_data[ticker] = result
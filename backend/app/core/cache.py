@@ -24,6 +24,8 @@ class CacheTTL:
 
     # ── Research ──────────────────────────────────────────────────
     STOCK_INFO = 1800               # 30 min — fundamentals + valuation (data mění se max. kvartálně)
+    STOCK_INFO_STALE = 14400        # 4 hours — serve stale stock info while refreshing in background
+    STOCK_INFO_NOT_FOUND = 300      # 5 min  — ticker without a price on Yahoo (unknown / delisted)
     TECHNICAL_RAW = 3600            # 1 hour — 2y raw OHLCV + computed indicators
     TECHNICAL_SIGNALS = 300         # 5 min  — filtered signals per period
 
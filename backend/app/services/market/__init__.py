@@ -16,7 +16,7 @@ from app.core.redis import get_redis
 from .quotes import get_quotes, get_price_history, get_batch_price_history
 from .options_quotes import get_option_quotes
 from .stock_info import get_stock_info, StockInfoUnavailableError
-from .technical import get_technical_indicators
+from .technical import get_technical_indicators, get_technical_indicators_batch
 from .financials import get_historical_financials
 from .earnings_data import get_earnings_data
 
@@ -54,6 +54,10 @@ class MarketDataService:
         """Calculate technical indicators for a stock."""
         return await get_technical_indicators(self.redis, ticker, period)
 
+    async def get_technical_indicators_batch(self, tickers: List[str], period: str = "1y") -> Dict[str, Optional[dict]]:
+        """Technical indicators for multiple tickers (one batch download for all cache misses)."""
+        return await get_technical_indicators_batch(self.redis, tickers, period)
+
     async def get_historical_financials(self, ticker: str) -> Optional[dict]:
         """Get historical annual financials: multiples, profitability, growth."""
         return await get_historical_financials(self.redis, ticker)
@@ -2,10 +2,20 @@
 Stock info and fundamental insights generation
 """
 import yfinance as yf
-import pandas as pd
-import json
+import asyncio
 import logging
-from typing import List, Optional
+import operator
+import orjson
+import random
+import re
+import sys
+import time
+from bisect import bisect_left, bisect_right
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime, timezone
+from functools import lru_cache, partial
+from types import SimpleNamespace
+from typing import Callable, Dict, Iterator, List, NamedTuple, Optional, Tuple
 from app.core.cache import CacheTTL
 from app.core.taxonomy import SECTOR_KEYS
 from app.services.market.financials import get_historical_financials
@@ -20,7 +30,7 @@ class StockInfoUnavailableError(Exception):
 def _extract_officers(info: dict) -> dict:
     """Extract company officers from yfinance .info, identifying the CEO specifically."""
     raw_officers = info.get("companyOfficers") or []
-    current_year = pd.Timestamp.now().year
+    current_year = datetime.now(timezone.utc).year
 
     officers = []
     ceo = None
@@ -232,6 +242,41 @@ DEFAULT_RULES = {
     "sector_label": "",
 }
 
+# Optional sector-rule keys and their defaults
+_RULE_DEFAULTS = {
+    "ignore_debt": False,
+    "ignore_pe": False,
+    "pb_matters": False,
+    "pb_cheap": None,
+    "pb_expensive": None,
+    "div_yield_expected": None,
+    "payout_ratio_ok": 1.0,
+}
+
+
+def _resolve_rules(rules: dict) -> SimpleNamespace:
+    """
+    Fill in optional keys and precompute the sector wording used by insight
+    texts and the percent thresholds as fractions (None = not applicable).
+    """
+    label = rules.get("sector_label")
+    gm_warning = rules["gross_margin_warning"]
+    gm_good = rules["gross_margin_good"]
+    return SimpleNamespace(**{
+        **_RULE_DEFAULTS,
+        **rules,
+        "sector_context": f" pro {label} firmu" if label else "",
+        "sector_context_sector": f" pro {label} sektor" if label else "",
+        "gross_margin_warning_frac": gm_warning / 100 if gm_warning > 0 else None,
+        "gross_margin_good_frac": gm_good / 100 if gm_good > 0 else None,
+        "roe_good_frac": rules["roe_good"] / 100,
+    })
+
+
+# Sector rules with every key filled in, resolved once at import (attribute access)
+_SECTOR_RULES_RESOLVED = {sector: _resolve_rules(rules) for sector, rules in SECTOR_RULES.items()}
+_DEFAULT_RULES_RESOLVED = _resolve_rules(DEFAULT_RULES)
+
 
 # ============================================================
 # LAYER 4 HELPER: HISTORICAL TREND INSIGHTS
@@ -509,486 +554,494 @@ def _generate_historical_insights(historical: dict) -> List[dict]:
     return insights
 
 
-def generate_insights(data: dict, historical: Optional[dict] = None) -> List[dict]:
-    """
-    Generate automatic fundamental analysis insights.
-    Returns list of insights with type (positive/warning/info), title, and description.
+# ============================================================
+# LAYERS 1-3: SNAPSHOT INSIGHT RULES
+# ============================================================
+# Each rule is (metric, op, threshold, gate, type, title, template):
+# - fires when m[metric] is present and op(value, threshold) holds and, if
+#   given, gate(value, m, r) holds too;
+# - threshold is a number, a (low, high) pair for the range ops, the name of a
+#   sector-rule attribute, or a callable(r). A threshold resolving to None
+#   means the rule does not apply to that sector;
+# - template is formatted with the value (`v`, `pct` = v * 100, `abs_pct`),
+#   the metric map (`m`) and the resolved sector rules (`r`).
+# `m` holds the numeric inputs plus the derived values built in
+# _snapshot_insights. Table order is the order insights are emitted in.
+# Thresholds are resolved per sector at import (_RULES_BY_SECTOR).
 
-    Implements 4 layers:
-    1. Universal Red/Green Flags
-    2. Contextual Combinations
-    3. Sector-Specific Rules
-    4. Historical Trend Insights (if historical data available)
-    """
-    insights = []
-    sector = data.get("sector") or ""
-    
-    rules = SECTOR_RULES.get(sector, DEFAULT_RULES)
-    
-    # Helper to safely get numeric values
-    def get_num(key: str) -> Optional[float]:
-        val = data.get(key)
-        return float(val) if val is not None else None
-    
-    # ============================================================
-    # LAYER 1: UNIVERSAL RED FLAGS (with sector adjustments)
-    # ============================================================
-    
+
+def _between(v, bounds):
+    """Open interval: low < v < high."""
+    return bounds[0] < v < bounds[1]
+
+
+def _from_to(v, bounds):
+    """Half-open interval: low <= v < high."""
+    return bounds[0] <= v < bounds[1]
+
+
+def _abs_gt(v, t):
+    return abs(v) > t
+
+
+# Layer 1: universal red/green flags (with sector adjustments)
+_FLAG_RULES = (
     # Liquidity risk (universal - always matters)
-    current_ratio = get_num("currentRatio")
-    if current_ratio is not None and current_ratio < 1.0:
-        insights.append({
-            "type": "warning",
-            "title": "Riziko likvidity",
-            "description": f"Current Ratio je {current_ratio:.2f}, což je pod 1.0. Firma může mít problémy splácet krátkodobé závazky.",
-        })
-    
+    ("currentRatio", operator.lt, 1.0, None,
+     "warning", "Riziko likvidity",
+     "Current Ratio je {v:.2f}, což je pod 1.0. Firma může mít problémy splácet krátkodobé závazky."),
     # High debt (sector-adjusted)
-    debt_equity = get_num("debtToEquity")
-    if not rules.get("ignore_debt", False):
-        if debt_equity is not None and debt_equity > rules["debt_equity_warning"]:
-            sector_context = f" pro {rules['sector_label']} firmu" if rules.get("sector_label") else ""
-            insights.append({
-                "type": "warning",
-                "title": "Vysoké zadlužení",
-                "description": f"Debt/Equity je {debt_equity:.0f}%, což je vysoké{sector_context}. Limit pro tento sektor je {rules['debt_equity_warning']:.0f}%.",
-            })
-    
-    # Unsustainable dividend (sector-adjusted for REITs)
-    payout_ratio = get_num("payoutRatio")
-    payout_limit = rules.get("payout_ratio_ok", 1.0)
-    if payout_ratio is not None and payout_ratio > payout_limit:
-        if sector == "Real Estate":
-            # For REITs, only warn if extremely high (>190% - same as DDM model)
-            if payout_ratio > 1.9:
-                insights.append({
-                    "type": "warning",
-                    "title": "Extrémně vysoký payout",
-                    "description": f"Payout Ratio je {payout_ratio * 100:.0f}%. I pro REIT je to neobvykle vysoké.",
-                })
-        else:
-            insights.append({
-                "type": "warning",
-                "title": "Neudržitelná dividenda",
-                "description": f"Payout Ratio je {payout_ratio * 100:.0f}%. Firma vyplácí více na dividendách, než vydělává.",
-            })
-    
+    ("debtToEquity", operator.gt, lambda r: None if r.ignore_debt else r.debt_equity_warning, None,
+     "warning", "Vysoké zadlužení",
+     "Debt/Equity je {v:.0f}%, což je vysoké{r.sector_context}. Limit pro tento sektor je {r.debt_equity_warning:.0f}%."),
+    # Unsustainable dividend (sector-adjusted for REITs: only warn if >190% - same as DDM model)
+    ("payoutRatio", operator.gt, "payout_ratio_ok", lambda v, m, r: m["sector"] == "Real Estate" and v > 1.9,
+     "warning", "Extrémně vysoký payout",
+     "Payout Ratio je {pct:.0f}%. I pro REIT je to neobvykle vysoké."),
+    ("payoutRatio", operator.gt, "payout_ratio_ok", lambda v, m, r: m["sector"] != "Real Estate",
+     "warning", "Neudržitelná dividenda",
+     "Payout Ratio je {pct:.0f}%. Firma vyplácí více na dividendách, než vydělává."),
     # Negative EPS (universal)
-    eps = get_num("eps")
-    if eps is not None and eps < 0:
-        insights.append({
-            "type": "warning",
-            "title": "Ztrátová společnost",
-            "description": f"EPS je {eps:.2f}. Firma aktuálně negeneruje zisk.",
-        })
-    
+    ("eps", operator.lt, 0, None,
+     "warning", "Ztrátová společnost",
+     "EPS je {v:.2f}. Firma aktuálně negeneruje zisk."),
     # Negative FCF (universal)
-    fcf = get_num("freeCashflow")
-    if fcf is not None and fcf < 0:
-        insights.append({
-            "type": "warning",
-            "title": "Záporný cash flow",
-            "description": "Free Cash Flow je záporný. Firma spotřebovává hotovost.",
-        })
-    
+    ("freeCashflow", operator.lt, 0, None,
+     "warning", "Záporný cash flow",
+     "Free Cash Flow je záporný. Firma spotřebovává hotovost."),
     # Declining revenue (universal)
-    rev_growth = get_num("revenueGrowth")
-    if rev_growth is not None and rev_growth < -0.05:
-        insights.append({
-            "type": "warning",
-            "title": "Klesající tržby",
-            "description": f"Tržby klesly o {abs(rev_growth * 100):.1f}% meziročně.",
-        })
-    
+    ("revenueGrowth", operator.lt, -0.05, None,
+     "warning", "Klesající tržby",
+     "Tržby klesly o {abs_pct:.1f}% meziročně."),
     # Low gross margin for sector (sector-specific)
-    gross_margin = get_num("grossMargin")
-    op_margin = get_num("operatingMargin")
-    roa = get_num("roa")
-    operating_quality_ok = not (
-        (op_margin is not None and op_margin <= 0)
-        or (roa is not None and roa < 0)
-    )
-    if gross_margin is not None and rules["gross_margin_warning"] > 0:
-        if gross_margin < rules["gross_margin_warning"] / 100:
-            sector_context = f" pro {rules['sector_label']} firmu" if rules.get("sector_label") else ""
-            insights.append({
-                "type": "warning",
-                "title": "Nízká hrubá marže",
-                "description": f"Gross Margin {gross_margin * 100:.1f}% je nízká{sector_context}. Očekává se alespoň {rules['gross_margin_warning']}%.",
-            })
-    
-    # ============================================================
-    # LAYER 1: UNIVERSAL GREEN FLAGS (with sector adjustments)
-    # ============================================================
-    
+    ("grossMargin", operator.lt,
+     "gross_margin_warning_frac", None,
+     "warning", "Nízká hrubá marže",
+     "Gross Margin {pct:.1f}% je nízká{r.sector_context}. Očekává se alespoň {r.gross_margin_warning}%."),
     # PEG analysis (universal)
-    peg = get_num("pegRatio")
-    if peg is not None:
-        if 0 < peg < 1.0:
-            insights.append({
-                "type": "positive",
-                "title": "Podhodnocené vzhledem k růstu",
-                "description": f"PEG Ratio je {peg:.2f}. Akcie je levná vzhledem k očekávanému růstu (PEG < 1).",
-            })
-        elif peg > 2.0:
-            insights.append({
-                "type": "warning",
-                "title": "Vysoký PEG Ratio",
-                "description": f"PEG Ratio je {peg:.2f}. Drahá valuace vzhledem k růstu (PEG > 2 = přeplaceno).",
-            })
-    
+    ("pegRatio", _between, (0, 1.0), None,
+     "positive", "Podhodnocené vzhledem k růstu",
+     "PEG Ratio je {v:.2f}. Akcie je levná vzhledem k očekávanému růstu (PEG < 1)."),
+    ("pegRatio", operator.gt, 2.0, None,
+     "warning", "Vysoký PEG Ratio",
+     "PEG Ratio je {v:.2f}. Drahá valuace vzhledem k růstu (PEG > 2 = přeplaceno)."),
     # Excellent ROE (sector-adjusted)
-    roe = get_num("roe")
-    roe_threshold = rules.get("roe_good", 15) / 100
-    if roe is not None and roe > roe_threshold and operating_quality_ok:
-        sector_context = f" pro {rules['sector_label']} sektor" if rules.get("sector_label") else ""
-        insights.append({
-            "type": "positive",
-            "title": "Silná návratnost kapitálu",
-            "description": f"ROE je {roe * 100:.1f}%, což překračuje {rules['roe_good']}% (dobré{sector_context}).",
-        })
-    
+    ("roe", operator.gt, "roe_good_frac", lambda v, m, r: m["operating_quality_ok"],
+     "positive", "Silná návratnost kapitálu",
+     "ROE je {pct:.1f}%, což překračuje {r.roe_good}% (dobré{r.sector_context_sector})."),
     # High gross margin (sector-adjusted)
-    if gross_margin is not None and rules["gross_margin_good"] > 0:
-        if gross_margin > rules["gross_margin_good"] / 100:
-            insights.append({
-                "type": "positive",
-                "title": "Silná hrubá marže",
-                "description": f"Gross Margin {gross_margin * 100:.1f}% je nad očekávanou úrovní {rules['gross_margin_good']}% pro tento sektor.",
-            })
-    
+    ("grossMargin", operator.gt,
+     "gross_margin_good_frac", None,
+     "positive", "Silná hrubá marže",
+     "Gross Margin {pct:.1f}% je nad očekávanou úrovní {r.gross_margin_good}% pro tento sektor."),
     # Strong liquidity (universal)
-    if current_ratio is not None and current_ratio > 2.0:
-        insights.append({
-            "type": "positive",
-            "title": "Silná likvidita",
-            "description": f"Current Ratio je {current_ratio:.2f}. Robustní finanční polštář.",
-        })
-    
+    ("currentRatio", operator.gt, 2.0, None,
+     "positive", "Silná likvidita",
+     "Current Ratio je {v:.2f}. Robustní finanční polštář."),
     # Low debt for sector
-    if not rules.get("ignore_debt", False):
-        if debt_equity is not None and 0 <= debt_equity < rules["debt_equity_ok"]:
-            insights.append({
-                "type": "positive",
-                "title": "Konzervativní zadlužení",
-                "description": f"Debt/Equity {debt_equity:.0f}% je pod bezpečnou hranicí {rules['debt_equity_ok']}% pro tento sektor.",
-            })
-    
+    ("debtToEquity", _from_to, lambda r: None if r.ignore_debt else (0, r.debt_equity_ok), None,
+     "positive", "Konzervativní zadlužení",
+     "Debt/Equity {v:.0f}% je pod bezpečnou hranicí {r.debt_equity_ok}% pro tento sektor."),
     # Strong growth (universal)
-    if rev_growth is not None and rev_growth > 0.20:
-        insights.append({
-            "type": "positive",
-            "title": "Silný růst tržeb",
-            "description": f"Tržby rostou o {rev_growth * 100:.1f}% meziročně.",
-        })
-    
-    # ============================================================
-    # LAYER 2: CONTEXTUAL COMBINATIONS
-    # ============================================================
-    
-    trailing_pe = get_num("trailingPE")
-    forward_pe = get_num("forwardPE")
-    
-    # Earnings growth expected
-    if (
-        trailing_pe is not None
-        and forward_pe is not None
-        and trailing_pe > 0
-        and forward_pe > 0
-        and forward_pe < trailing_pe * 0.85
-    ):
-        insights.append({
-            "type": "positive",
-            "title": "Očekávaný růst zisků",
-            "description": f"Forward P/E ({forward_pe:.1f}) je nižší než Trailing P/E ({trailing_pe:.1f}). Očekává se růst.",
-        })
-    
+    ("revenueGrowth", operator.gt, 0.20, None,
+     "positive", "Silný růst tržeb",
+     "Tržby rostou o {pct:.1f}% meziročně."),
+)
+
+# Layer 2: contextual combinations
+_COMBINATION_RULES = (
+    # Earnings growth expected (pe_trend: -1 = forward P/E well below trailing, +1 = well above)
+    ("pe_trend", operator.lt, 0, None,
+     "positive", "Očekávaný růst zisků",
+     "Forward P/E ({m[forwardPE]:.1f}) je nižší než Trailing P/E ({m[trailingPE]:.1f}). Očekává se růst."),
     # Earnings decline expected
-    if trailing_pe is not None and forward_pe is not None and forward_pe > trailing_pe * 1.15:
-        insights.append({
-            "type": "warning",
-            "title": "Očekávaný pokles zisků",
-            "description": f"Forward P/E ({forward_pe:.1f}) je vyšší než Trailing P/E ({trailing_pe:.1f}). Očekává se pokles.",
-        })
-    
+    ("pe_trend", operator.gt, 0, None,
+     "warning", "Očekávaný pokles zisků",
+     "Forward P/E ({m[forwardPE]:.1f}) je vyšší než Trailing P/E ({m[trailingPE]:.1f}). Očekává se pokles."),
     # P/E analysis (sector-adjusted, skip for REITs)
-    if not rules.get("ignore_pe", False) and trailing_pe is not None:
-        if trailing_pe > rules["pe_high"] and (rev_growth is None or rev_growth < 0.15):
-            insights.append({
-                "type": "warning",
-                "title": "Vysoká valuace",
-                "description": f"P/E {trailing_pe:.1f} je nad {rules['pe_high']} (běžné pro {sector or 'tento sektor'}) bez odpovídajícího růstu.",
-            })
-        elif 0 < trailing_pe < rules["pe_low"] and (rev_growth is None or rev_growth > 0):
-            insights.append({
-                "type": "positive",
-                "title": "Nízká valuace",
-                "description": f"P/E {trailing_pe:.1f} je pod {rules['pe_low']}. Může být podhodnocená.",
-            })
-    
+    ("trailingPE", operator.gt, lambda r: None if r.ignore_pe else r.pe_high,
+     lambda v, m, r: m["revenueGrowth"] is None or m["revenueGrowth"] < 0.15,
+     "warning", "Vysoká valuace",
+     "P/E {v:.1f} je nad {r.pe_high} (běžné pro {m[sector_name]}) bez odpovídajícího růstu."),
+    ("trailingPE", _between, lambda r: None if r.ignore_pe else (0, r.pe_low),
+     lambda v, m, r: m["revenueGrowth"] is None or m["revenueGrowth"] > 0,
+     "positive", "Nízká valuace",
+     "P/E {v:.1f} je pod {r.pe_low}. Může být podhodnocená."),
     # Healthy dividend (universal)
-    div_yield = get_num("dividendYield")
-    if div_yield is not None and div_yield > 0.02 and payout_ratio is not None and payout_ratio < 0.6:
-        insights.append({
-            "type": "positive",
-            "title": "Zdravá dividenda",
-            "description": f"Výnos {div_yield * 100:.2f}% s Payout Ratio {payout_ratio * 100:.0f}%. Udržitelná s prostorem pro růst.",
-        })
-    
+    ("dividendYield", operator.gt, 0.02,
+     lambda v, m, r: m["payoutRatio"] is not None and m["payoutRatio"] < 0.6,
+     "positive", "Zdravá dividenda",
+     "Výnos {pct:.2f}% s Payout Ratio {m[payout_pct]:.0f}%. Udržitelná s prostorem pro růst."),
     # Strong profitability combo (universal)
-    if op_margin is not None and op_margin > 0.25 and roe is not None and roe > 0.15:
-        insights.append({
-            "type": "positive",
-            "title": "Kvalitní business model",
-            "description": f"Operating Margin {op_margin * 100:.1f}% + ROE {roe * 100:.1f}% = konkurenční výhoda.",
-        })
-    
-    # ============================================================
-    # LAYER 2b: ADDITIONAL METRICS (not sector-specific)
-    # ============================================================
-    
-    # Market Cap classification
-    market_cap = get_num("marketCap")
-    if market_cap is not None:
-        if market_cap >= 200e9:  # $200B+
-            insights.append({
-                "type": "info",
-                "title": "Mega Cap",
-                "description": f"Tržní kapitalizace ${market_cap/1e9:.0f}B. Jedna z největších firem na světě, vysoká stabilita.",
-            })
-        elif market_cap >= 10e9:  # $10B+
-            insights.append({
-                "type": "info",
-                "title": "Large Cap",
-                "description": f"Tržní kapitalizace ${market_cap/1e9:.1f}B. Zavedená firma s nižší volatilitou.",
-            })
-        elif market_cap >= 2e9:  # $2B+
-            insights.append({
-                "type": "info",
-                "title": "Mid Cap",
-                "description": f"Tržní kapitalizace ${market_cap/1e9:.1f}B. Růstový potenciál s přiměřeným rizikem.",
-            })
-        elif market_cap >= 300e6:  # $300M+
-            insights.append({
-                "type": "info",
-                "title": "Small Cap",
-                "description": f"Tržní kapitalizace ${market_cap/1e6:.0f}M. Vyšší volatilita, ale růstový potenciál.",
-            })
-        else:
-            insights.append({
-                "type": "warning",
-                "title": "Micro Cap",
-                "description": f"Tržní kapitalizace ${market_cap/1e6:.0f}M. Vysoké riziko, nízká likvidita.",
-            })
-    
+    ("operatingMargin", operator.gt, 0.25,
+     lambda v, m, r: m["roe"] is not None and m["roe"] > 0.15,
+     "positive", "Kvalitní business model",
+     "Operating Margin {pct:.1f}% + ROE {m[roe_pct]:.1f}% = konkurenční výhoda."),
+)
+
+# Layer 2b: additional metrics (not sector-specific)
+_METRIC_RULES = (
     # EV/EBITDA analysis
-    ev_ebitda = get_num("enterpriseToEbitda")
-    if ev_ebitda is not None:
-        if 0 < ev_ebitda < 8:
-            insights.append({
-                "type": "positive",
-                "title": "Nízké EV/EBITDA",
-                "description": f"EV/EBITDA je {ev_ebitda:.1f}. Firma je levná z pohledu provozního zisku.",
-            })
-        elif ev_ebitda > 20:
-            insights.append({
-                "type": "warning",
-                "title": "Vysoké EV/EBITDA",
-                "description": f"EV/EBITDA je {ev_ebitda:.1f}. Drahá valuace, očekává se vysoký růst.",
-            })
-    
+    ("enterpriseToEbitda", _between, (0, 8), None,
+     "positive", "Nízké EV/EBITDA",
+     "EV/EBITDA je {v:.1f}. Firma je levná z pohledu provozního zisku."),
+    ("enterpriseToEbitda", operator.gt, 20, None,
+     "warning", "Vysoké EV/EBITDA",
+     "EV/EBITDA je {v:.1f}. Drahá valuace, očekává se vysoký růst."),
     # Profit Margin analysis
-    profit_margin = get_num("profitMargin")
-    if profit_margin is not None:
-        if profit_margin > 0.25 and op_margin is not None and op_margin > 0.10:
-            insights.append({
-                "type": "positive",
-                "title": "Vynikající čistá marže",
-                "description": f"Profit Margin {profit_margin * 100:.1f}% je špičková. Firma má silnou cenovou sílu.",
-            })
-        elif profit_margin < 0.05 and profit_margin > 0:
-            insights.append({
-                "type": "warning",
-                "title": "Nízká čistá marže",
-                "description": f"Profit Margin {profit_margin * 100:.1f}% je slabá. Malý prostor pro chyby.",
-            })
-    
+    ("profitMargin", operator.gt, 0.25,
+     lambda v, m, r: m["operatingMargin"] is not None and m["operatingMargin"] > 0.10,
+     "positive", "Vynikající čistá marže",
+     "Profit Margin {pct:.1f}% je špičková. Firma má silnou cenovou sílu."),
+    ("profitMargin", _between, (0, 0.05), None,
+     "warning", "Nízká čistá marže",
+     "Profit Margin {pct:.1f}% je slabá. Malý prostor pro chyby."),
     # Quick Ratio (stricter than Current Ratio)
-    quick_ratio = get_num("quickRatio")
-    if quick_ratio is not None:
-        if quick_ratio < 0.5:
-            insights.append({
-                "type": "warning",
-                "title": "Nízká okamžitá likvidita",
-                "description": f"Quick Ratio {quick_ratio:.2f} je pod 0.5. Bez zásob má firma málo hotovosti.",
-            })
-        elif quick_ratio > 1.5:
-            insights.append({
-                "type": "positive",
-                "title": "Silná okamžitá likvidita",
-                "description": f"Quick Ratio {quick_ratio:.2f}. Dostatek hotovosti bez nutnosti prodeje zásob.",
-            })
-    
+    ("quickRatio", operator.lt, 0.5, None,
+     "warning", "Nízká okamžitá likvidita",
+     "Quick Ratio {v:.2f} je pod 0.5. Bez zásob má firma málo hotovosti."),
+    ("quickRatio", operator.gt, 1.5, None,
+     "positive", "Silná okamžitá likvidita",
+     "Quick Ratio {v:.2f}. Dostatek hotovosti bez nutnosti prodeje zásob."),
     # ROA analysis
-    if roa is not None:
-        if roa > 0.15:
-            insights.append({
-                "type": "positive",
-                "title": "Vynikající ROA",
-                "description": f"Return on Assets {roa * 100:.1f}% překračuje 15%. Efektivní využití majetku.",
-            })
-        elif roa < 0.03 and roa > 0:
-            insights.append({
-                "type": "warning",
-                "title": "Nízké ROA",
-                "description": f"Return on Assets {roa * 100:.1f}% je pod 3%. Neefektivní využití aktiv.",
-            })
-    
+    ("roa", operator.gt, 0.15, None,
+     "positive", "Vynikající ROA",
+     "Return on Assets {pct:.1f}% překračuje 15%. Efektivní využití majetku."),
+    ("roa", _between, (0, 0.03), None,
+     "warning", "Nízké ROA",
+     "Return on Assets {pct:.1f}% je pod 3%. Neefektivní využití aktiv."),
     # Volume analysis (unusual activity)
-    volume = get_num("volume")
-    avg_volume = get_num("avgVolume")
-    if volume is not None and avg_volume is not None and avg_volume > 0:
-        volume_ratio = volume / avg_volume
-        if volume_ratio > 3:
-            insights.append({
-                "type": "info",
-                "title": "Neobvykle vysoký objem",
-                "description": f"Dnešní objem je {volume_ratio:.1f}× vyšší než průměr. Zvýšený zájem investorů.",
-            })
-        elif volume_ratio < 0.3:
-            insights.append({
-                "type": "info",
-                "title": "Nízký objem",
-                "description": f"Dnešní objem je jen {volume_ratio * 100:.0f}% průměru. Nízká aktivita.",
-            })
-    
+    ("volume_ratio", operator.gt, 3, None,
+     "info", "Neobvykle vysoký objem",
+     "Dnešní objem je {v:.1f}× vyšší než průměr. Zvýšený zájem investorů."),
+    ("volume_ratio", operator.lt, 0.3, None,
+     "info", "Nízký objem",
+     "Dnešní objem je jen {pct:.0f}% průměru. Nízká aktivita."),
     # EPS growth (TTM vs Forward)
-    forward_eps = get_num("forwardEps")
-    if eps is not None and forward_eps is not None and eps > 0:
-        eps_growth = (forward_eps - eps) / eps
-        if eps_growth > 0.20:
-            insights.append({
-                "type": "positive",
-                "title": "Očekávaný růst EPS",
-                "description": f"Forward EPS ({forward_eps:.2f}) je o {eps_growth * 100:.0f}% vyšší než TTM ({eps:.2f}). Silný výhled.",
-            })
-        elif eps_growth < -0.15:
-            insights.append({
-                "type": "warning",
-                "title": "Očekávaný pokles EPS",
-                "description": f"Forward EPS ({forward_eps:.2f}) je o {abs(eps_growth) * 100:.0f}% nižší než TTM ({eps:.2f}). Slabý výhled.",
-            })
-
+    ("eps_growth", operator.gt, 0.20, None,
+     "positive", "Očekávaný růst EPS",
+     "Forward EPS ({m[forwardEps]:.2f}) je o {pct:.0f}% vyšší než TTM ({m[eps]:.2f}). Silný výhled."),
+    ("eps_growth", operator.lt, -0.15, None,
+     "warning", "Očekávaný pokles EPS",
+     "Forward EPS ({m[forwardEps]:.2f}) je o {abs_pct:.0f}% nižší než TTM ({m[eps]:.2f}). Slabý výhled."),
     # Low base effect warning on EPS growth
-    earnings_growth = get_num("earningsGrowth")
-    if (earnings_growth is not None and abs(earnings_growth) > 1.0
-            and eps is not None and 0 < abs(eps) < 1.0):
-        insights.append({
-            "type": "info",
-            "title": "Efekt nízké báze u EPS",
-            "description": (
-                f"Růst EPS ({earnings_growth * 100:.0f}%) vychází z nízké báze "
-                f"(EPS {eps:.2f}). Procentuální změna může být zavádějící — "
-                f"sledujte absolutní hodnoty."
-            ),
-        })
-
-    # P/S analysis
+    ("earningsGrowth", _abs_gt, 1.0,
+     lambda v, m, r: m["eps"] is not None and 0 < abs(m["eps"]) < 1.0,
+     "info", "Efekt nízké báze u EPS",
+     "Růst EPS ({pct:.0f}%) vychází z nízké báze (EPS {m[eps]:.2f}). Procentuální změna může být "
+     "zavádějící — sledujte absolutní hodnoty."),
+    # P/S analysis (< 0.1 is essentially impossible — treat as bad data)
+    ("ps", _from_to, (0.1, 1), None,
+     "positive", "Nízké P/S",
+     "Price/Sales {v:.2f} je pod 1. Velmi levně oceněná firma vůči tržbám."),
+    ("ps", operator.gt, 15, None,
+     "warning", "Vysoké P/S",
+     "Price/Sales {v:.1f} je nad 15. Vysoká očekávání růstu tržeb."),
+)
+
+# Layer 3: sector-specific insights (emitted after the P/B block)
+_SECTOR_SPECIFIC_RULES = (
+    # Utilities/Energy: Expected dividend
+    ("dividendYield", operator.lt, "div_yield_expected", None,
+     "info", "Nízká dividenda pro sektor",
+     "Dividendový výnos {pct:.2f}% je pod očekávanou úrovní {m[expected_div_pct]:.0f}% pro {m[sector]}."),
+    ("dividendYield", operator.gt,
+     lambda r: r.div_yield_expected * 1.5 if r.div_yield_expected else None, None,
+     "positive", "Nadprůměrná dividenda",
+     "Dividendový výnos {pct:.2f}% výrazně překračuje očekávání pro {m[sector]}."),
+    # Real Estate: Warn about P/E being misleading
+    ("trailingPE", None, None, lambda v, m, r: m["sector"] == "Real Estate",
+     "info", "P/E není vhodná metrika",
+     "Pro REITs je P/E zkresleno odpisy. Použijte FFO nebo P/FFO pro správné hodnocení."),
+)
+
+_SNAPSHOT_RULES = _FLAG_RULES + _COMBINATION_RULES
+
+# Market Cap classification: bisect_right(_MARKET_CAP_THRESHOLDS, cap) indexes _MARKET_CAP_TIERS
+_MARKET_CAP_THRESHOLDS = (300e6, 2e9, 10e9, 200e9)
+_MARKET_CAP_TIERS = (
+    ("warning", "Micro Cap",
+     "Tržní kapitalizace ${m[market_cap_m]:.0f}M. Vysoké riziko, nízká likvidita.".format),
+    ("info", "Small Cap",  # $300M+
+     "Tržní kapitalizace ${m[market_cap_m]:.0f}M. Vyšší volatilita, ale růstový potenciál.".format),
+    ("info", "Mid Cap",  # $2B+
+     "Tržní kapitalizace ${m[market_cap_b]:.1f}B. Růstový potenciál s přiměřeným rizikem.".format),
+    ("info", "Large Cap",  # $10B+
+     "Tržní kapitalizace ${m[market_cap_b]:.1f}B. Zavedená firma s nižší volatilitou.".format),
+    ("info", "Mega Cap",  # $200B+
+     "Tržní kapitalizace ${m[market_cap_b]:.0f}B. Jedna z největších firem na světě, vysoká stabilita.".format),
+)
+
+# Numeric inputs read from the stock info dict
+_NUM_KEYS = (
+    "currentRatio", "debtToEquity", "payoutRatio", "eps", "freeCashflow",
+    "revenueGrowth", "grossMargin", "operatingMargin", "roa", "pegRatio",
+    "roe", "trailingPE", "forwardPE", "dividendYield", "marketCap",
+    "enterpriseToEbitda", "profitMargin", "quickRatio", "volume", "avgVolume",
+    "forwardEps", "earningsGrowth", "revenue", "priceToSales", "priceToBook",
+)
+
+_NUM_GETTER = operator.itemgetter(*_NUM_KEYS)
+
+
+def _to_float(val) -> Optional[float]:
+    """Coerce a raw info value to float, keeping None as None (floats pass through untouched)."""
+    if val is None or type(val) is float:
+        return val
+    return float(val)
+
+
+class Insight(NamedTuple):
+    """One snapshot insight; cached as-is and turned into a dict at the API boundary."""
+    type: str
+    title: str
+    description: str
+
+
+# Hand-coded P/B insights: key -> (type, title, template formatted with the P/B value `v`)
+_PB_INSIGHTS = {
+    "pb_cheap_financial": ("positive", "Levná finanční firma",
+                           "P/B je {v:.2f}, pod 1.0. Obchoduje se pod účetní hodnotou."),
+    "pb_expensive_financial": ("info", "Dražší finanční firma",
+                               "P/B je {v:.2f}, nad 2.0. Premium valuace pro finanční sektor."),
+    "pb_below_book": ("positive", "Obchodování pod účetní hodnotou",
+                      "P/B je {v:.2f}. Akcie stojí méně než hodnota čistých aktiv (P/B < 1)."),
+    "pb_high_utility": ("info", "Vysoké P/B pro utility",
+                        "P/B je {v:.2f}. Premium valuace pro utility sektor."),
+    "pb_high_cyclical": ("warning", "Vysoké P/B pro cyklický sektor",
+                         "P/B je {v:.2f}. Může signalizovat vrchol cyklu."),
+}
+
+
+def _emit(key: str, pb: float) -> Insight:
+    """Build a P/B Insight from its precomputed (type, title, template)."""
+    insight_type, title, template = _PB_INSIGHTS[key]
+    return Insight(insight_type, title, template.format(v=pb))
+
+
+def _pb_below_book(pb: float, rules: SimpleNamespace) -> Optional[Insight]:
+    """Asset-heavy sectors: P/B under 1.0 means trading below book value."""
+    return _emit("pb_below_book", pb) if pb < 1.0 else None
+
+
+def _pb_utility(pb: float, rules: SimpleNamespace) -> Optional[Insight]:
+    if pb < 1.0:
+        return _emit("pb_below_book", pb)
+    return _emit("pb_high_utility", pb) if pb > 2.5 else None
+
+
+def _pb_cyclical(pb: float, rules: SimpleNamespace) -> Optional[Insight]:
+    if pb < 1.0:
+        return _emit("pb_below_book", pb)
+    return _emit("pb_high_cyclical", pb) if pb > 2.5 else None
+
+
+def _pb_financial(pb: float, rules: SimpleNamespace) -> Optional[Insight]:
+    """Financials judge P/B against their own cheap/expensive bounds when P/B is a key metric."""
+    if not rules.pb_matters:
+        return _pb_below_book(pb, rules)
+    if pb < rules.pb_cheap:
+        return _emit("pb_cheap_financial", pb)
+    if pb > rules.pb_expensive:
+        return _emit("pb_expensive_financial", pb)
+    return None
+
+
+_PB_HIGH_CYCLICAL = frozenset({"Energy", "Basic Materials"})
+
+# P/B analysis for asset-heavy sectors: sector -> handler returning the insight (or None)
+_PB_HANDLERS: Dict[str, Callable[[float, SimpleNamespace], Optional[Insight]]] = {
+    "Financial Services": _pb_financial,
+    "Utilities": _pb_utility,
+    **{sector: _pb_cyclical for sector in _PB_HIGH_CYCLICAL},
+    "Industrials": _pb_below_book,
+    "Real Estate": _pb_below_book,
+}
+
+
+def _resolve_threshold(threshold, rules: SimpleNamespace):
+    """Resolve a rule threshold against one sector's rules (None = rule not applicable)."""
+    if callable(threshold):
+        return threshold(rules)
+    if isinstance(threshold, str):
+        return getattr(rules, threshold)
+    return threshold
+
+
+def _compile_insight_rules(table: tuple, rules: SimpleNamespace) -> tuple:
+    """
+    Resolve a rule table for one sector: thresholds become plain values, rules
+    that don't apply to the sector are dropped, template.format is pre-bound,
+    and rules whose template shows {pct}/{abs_pct} are flagged so the percent
+    is only computed where it's displayed.
+    """
+    compiled = []
+    for key, op, threshold, gate, insight_type, title, template in table:
+        resolved = _resolve_threshold(threshold, rules)
+        if op is not None and resolved is None:
+            continue
+        uses_pct = "{pct" in template or "{abs_pct" in template
+        compiled.append((key, op, resolved, gate, insight_type, title, template.format, uses_pct))
+    return tuple(compiled)
+
+
+def _compile_sector_rules(rules: SimpleNamespace) -> tuple:
+    """(rules, snapshot, metric, sector-specific) - one sector's rules and its compiled tables."""
+    return (
+        rules,
+        _compile_insight_rules(_SNAPSHOT_RULES, rules),
+        _compile_insight_rules(_METRIC_RULES, rules),
+        _compile_insight_rules(_SECTOR_SPECIFIC_RULES, rules),
+    )
+
+
+# Keys are interned literals; generate_insights interns the incoming sector so lookups match by identity
+_RULES_BY_SECTOR = {sector: _compile_sector_rules(rules) for sector, rules in _SECTOR_RULES_RESOLVED.items()}
+_DEFAULT_RULES_COMPILED = _compile_sector_rules(_DEFAULT_RULES_RESOLVED)
+
+
+def _fired_insights(table: tuple, m: dict, rules: SimpleNamespace) -> Iterator[Insight]:
+    """Evaluate a compiled rule table in order, yielding an insight for every rule that fires."""
+    for key, op, threshold, gate, insight_type, title, fmt, uses_pct in table:
+        v = m[key]
+        if v is None:
+            continue
+        if op is not None and not op(v, threshold):
+            continue
+        if gate is not None and not gate(v, m, rules):
+            continue
+        if uses_pct:
+            pct = v * 100
+            yield Insight(insight_type, title, fmt(v=v, pct=pct, abs_pct=abs(pct), m=m, r=rules))
+        else:
+            yield Insight(insight_type, title, fmt(v=v, m=m, r=rules))
+
+
+def generate_insights(data: dict, historical: Optional[dict] = None) -> Tuple[dict, ...]:
+    """
+    Generate automatic fundamental analysis insights.
+    Returns a tuple of insights with type (positive/warning/info), title, and description.
+
+    Implements 4 layers:
+    1. Universal Red/Green Flags
+    2. Contextual Combinations
+    3. Sector-Specific Rules
+    4. Historical Trend Insights (if historical data available)
+    """
+    sector = data.get("sector")
+    sector = sys.intern(sector) if sector else ""
+    try:
+        raw = _NUM_GETTER(data)
+    except KeyError:
+        # Partial dicts (tests, ad-hoc callers); fetched payloads carry every key
+        raw = tuple(map(data.get, _NUM_KEYS))
+    values = tuple(map(_to_float, raw))
+    # Every snapshot rule needs at least one metric; empty payloads skip layers 1-3
+    snapshot = _snapshot_insights(sector, values) if values.count(None) < len(values) else ()
+    insights = [insight._asdict() for insight in snapshot]
+
+    # ============================================================
+    # LAYER 4: HISTORICAL TREND INSIGHTS
+    # ============================================================
+    if historical:
+        insights.extend(_generate_historical_insights(historical))
+
+    return tuple(insights)
+
+
+def _snapshot_insights(sector: str, values: Tuple[Optional[float], ...]) -> Tuple[Insight, ...]:
+    """
+    Layers 1-3 for one sector and the _NUM_KEYS values.
+    """
+    insights = []
+    rules, snapshot_rules, metric_rules, sector_specific_rules = _RULES_BY_SECTOR.get(
+        sector, _DEFAULT_RULES_COMPILED
+    )
+    
+    m = dict(zip(_NUM_KEYS, values))
+
+    # Derived values shared by the rule tables
+    m["sector"] = sector
+    m["sector_name"] = sector or "tento sektor"
+    op_margin = m["operatingMargin"]
+    roa = m["roa"]
+    m["operating_quality_ok"] = not (
+        (op_margin is not None and op_margin <= 0)
+        or (roa is not None and roa < 0)
+    )
+    payout_ratio = m["payoutRatio"]
+    m["payout_pct"] = payout_ratio * 100 if payout_ratio is not None else None
+    roe = m["roe"]
+    m["roe_pct"] = roe * 100 if roe is not None else None
+    market_cap = m["marketCap"]
+    m["market_cap_b"] = market_cap / 1e9 if market_cap is not None else None
+    m["market_cap_m"] = market_cap / 1e6 if market_cap is not None else None
+
+    # Forward vs trailing P/E, compared once: the growth and decline cases are exclusive
+    trailing_pe = m["trailingPE"]
+    forward_pe = m["forwardPE"]
+    if trailing_pe is None or forward_pe is None:
+        m["pe_trend"] = None
+    elif trailing_pe > 0 and 0 < forward_pe < trailing_pe * 0.85:
+        m["pe_trend"] = -1.0
+    elif forward_pe > trailing_pe * 1.15:
+        m["pe_trend"] = 1.0
+    else:
+        m["pe_trend"] = None
+
+    volume = m["volume"]
+    avg_volume = m["avgVolume"]
+    m["volume_ratio"] = (
+        volume / avg_volume
+        if volume is not None and avg_volume is not None and avg_volume > 0
+        else None
+    )
+    eps = m["eps"]
+    forward_eps = m["forwardEps"]
+    m["eps_growth"] = (
+        (forward_eps - eps) / eps
+        if eps is not None and forward_eps is not None and eps > 0
+        else None
+    )
+
     # priceToSalesTrailing12Months from yfinance is unreliable for cross-listed
     # stocks (Frankfurt, London ADRs) — it uses the secondary listing's market cap
     # against full global revenue, producing near-zero values. Compute manually.
-    _ps_market_cap = get_num("marketCap")
-    _ps_revenue = get_num("revenue")
-    ps_manual = (_ps_market_cap / _ps_revenue) if (_ps_market_cap and _ps_revenue and _ps_revenue > 0) else None
-    ps_raw = get_num("priceToSales")
+    revenue = m["revenue"]
+    ps_manual = (market_cap / revenue) if (market_cap and revenue and revenue > 0) else None
     # Prefer manual; fallback to yfinance only if manual isn't available
-    ps = ps_manual if ps_manual is not None else ps_raw
-    if ps is not None and ps >= 0.1:  # < 0.1 is essentially impossible — treat as bad data
-        if ps < 1:
-            insights.append({
-                "type": "positive",
-                "title": "Nízké P/S",
-                "description": f"Price/Sales {ps:.2f} je pod 1. Velmi levně oceněná firma vůči tržbám.",
-            })
-        elif ps > 15:
-            insights.append({
-                "type": "warning",
-                "title": "Vysoké P/S",
-                "description": f"Price/Sales {ps:.1f} je nad 15. Vysoká očekávání růstu tržeb.",
-            })
-    
+    m["ps"] = ps_manual if ps_manual is not None else m["priceToSales"]
+
+    expected_div = rules.div_yield_expected
+    m["expected_div_pct"] = expected_div * 100 if expected_div else None
+
+    # ============================================================
+    # LAYERS 1-2b: FLAGS, COMBINATIONS, ADDITIONAL METRICS
+    # ============================================================
+    insights.extend(_fired_insights(snapshot_rules, m, rules))
+
+    if market_cap is not None:
+        # NaN fails every comparison and falls to the lowest tier, as the old if/elif chain did
+        tier = bisect_right(_MARKET_CAP_THRESHOLDS, market_cap) if market_cap == market_cap else 0
+        insight_type, title, fmt = _MARKET_CAP_TIERS[tier]
+        insights.append(Insight(insight_type, title, fmt(m=m)))
+
+    insights.extend(_fired_insights(metric_rules, m, rules))
+
     # ============================================================
     # LAYER 3: SECTOR-SPECIFIC INSIGHTS
     # ============================================================
     
     # P/B analysis for asset-heavy sectors (Financial Services, Utilities, Energy, Materials, Industrials)
-    pb = get_num("priceToBook")
-    if pb is not None and sector in ["Financial Services", "Utilities", "Energy", "Basic Materials", "Industrials", "Real Estate"]:
-        if sector == "Financial Services" and rules.get("pb_matters"):
-            if pb < rules["pb_cheap"]:
-                insights.append({
-                    "type": "positive",
-                    "title": "Levná finanční firma",
-                    "description": f"P/B je {pb:.2f}, pod 1.0. Obchoduje se pod účetní hodnotou.",
-                })
-            elif pb > rules["pb_expensive"]:
-                insights.append({
-                    "type": "info",
-                    "title": "Dražší finanční firma",
-                    "description": f"P/B je {pb:.2f}, nad 2.0. Premium valuace pro finanční sektor.",
-                })
-        else:
-            # Other asset-heavy sectors
-            if pb < 1.0:
-                insights.append({
-                    "type": "positive",
-                    "title": "Obchodování pod účetní hodnotou",
-                    "description": f"P/B je {pb:.2f}. Akcie stojí méně než hodnota čistých aktiv (P/B < 1).",
-                })
-            elif sector == "Utilities" and pb > 2.5:
-                insights.append({
-                    "type": "info",
-                    "title": "Vysoké P/B pro utility",
-                    "description": f"P/B je {pb:.2f}. Premium valuace pro utility sektor.",
-                })
-            elif sector in ["Energy", "Basic Materials"] and pb > 2.5:
-                insights.append({
-                    "type": "warning",
-                    "title": "Vysoké P/B pro cyklický sektor",
-                    "description": f"P/B je {pb:.2f}. Může signalizovat vrchol cyklu.",
-                })
-    
-    # Utilities/Energy: Expected dividend
-    expected_div = rules.get("div_yield_expected")
-    if expected_div and div_yield is not None:
-        if div_yield < expected_div:
-            insights.append({
-                "type": "info",
-                "title": "Nízká dividenda pro sektor",
-                "description": f"Dividendový výnos {div_yield * 100:.2f}% je pod očekávanou úrovní {expected_div * 100:.0f}% pro {sector}.",
-            })
-        elif div_yield > expected_div * 1.5:
-            insights.append({
-                "type": "positive",
-                "title": "Nadprůměrná dividenda",
-                "description": f"Dividendový výnos {div_yield * 100:.2f}% výrazně překračuje očekávání pro {sector}.",
-            })
+    pb = m["priceToBook"]
+    pb_handler = _PB_HANDLERS.get(sector)
+    if pb is not None and pb_handler is not None:
+        pb_insight = pb_handler(pb, rules)
+        if pb_insight is not None:
+            insights.append(pb_insight)
     
-    # Real Estate: Warn about P/E being misleading
-    if sector == "Real Estate" and trailing_pe is not None:
-        insights.append({
-            "type": "info",
-            "title": "P/E není vhodná metrika",
-            "description": "Pro REITs je P/E zkresleno odpisy. Použijte FFO nebo P/FFO pro správné hodnocení.",
-        })
-
-    # ============================================================
-    # LAYER 4: HISTORICAL TREND INSIGHTS
-    # ============================================================
-    if historical:
-        insights.extend(_generate_historical_insights(historical))
-
-    return insights
+    insights.extend(_fired_insights(sector_specific_rules, m, rules))
+    return tuple(insights)
 
 
 # ─── Fair Value / Valuation Models ────────────────────────────────────────────
@@ -1012,6 +1065,41 @@ assert set(SECTOR_PE_BENCHMARKS.keys()) == set(SECTOR_KEYS), (
     "SECTOR_PE_BENCHMARKS keys must match app.core.taxonomy.SECTOR_KEYS"
 )
 
+DEFAULT_PE_BENCHMARK = {"low": 15, "mid": 20, "high": 25}
+
+
+# Valuation model tooltips by method. Static text: the Redis copy of a payload
+# leaves them out and _unwrap_cached puts them back.
+_VALUATION_TOOLTIPS = {
+    "Grahamovy formule": "Klasická formule Benjamina Grahama pro 'vnitřní hodnotu'. Předpokládá, že férové P/E je 8.5 plus dvojnásobek růstu. Model je citlivý na úrokové sazby (Y). Vhodné pro ziskové, stabilní firmy.",
+    "DCF (Diskontované CF)": "Zlatý standard valuace. Počítá současnou hodnotu všech budoucích volných peněz, které firma vydělá. Nevhodné pro banky a pojišťovny.",
+    "P/E sektorový": "Srovnává firmu s typickými násobky v jejím sektoru. 'Lepší' firmy (vyšší ROE, marže, růst) si zaslouží ocenění na horní hraně sektoru, průměrné uprostřed. Nevhodné pro REITs (používají FFO).",
+    "Analytici (konsenzus)": "Průměrná cílová cena analytiků z Wall Street. Čím více analytiků pokrývá akcii, tím spolehlivější konsenzus. Nezapomeňte, že analytici mají tendenci být optimističtí.",
+    "Účetní hodnota (P/B)": (
+        "Ocenění dle účetní hodnoty (čistá aktiva = Aktiva - Závazky). "
+        "P/B < 1.0 znamená, že akcie stojí MÉNĚ než hodnota aktiv na akcii (potenciální příležitost). "
+        "Smysluplné jen pro banky, pojišťovny, utility a průmysl. "
+        "Pro technologie a služby je irelevantní (jejich hodnota je v IP a lidech, ne v rozvaze)."
+    ),
+    "Dividendový model": "Gordonův model oceňuje akcii jako nekonečnou řadu budoucích dividend. Vyžaduje, aby firma dividendu nejen vyplácela, ale aby na ni 'měla' (Payout Ratio < 100%). Ideální pro Utility, Coca-Colu apod.",
+    "EV/EBITDA": "Oceňuje firmu jako celek (včetně dluhu) oproti jejímu provoznímu zisku (EBITDA). Ideální pro průmysl, energie a utility, protože očišťuje vliv zadlužení a daní. Nevhodné pro banky.",
+    "Výnosová síla (EPV)": (
+        "Model dle Bruce Greenwalda. Ukazuje hodnotu firmy za předpokladu, že už nikdy neporoste "
+        "a bude jen udržovat současné zisky (Zero Growth). Je to 'tvrdá podlaha' hodnoty. "
+        "Pokud je cena akcie pod touto hodnotou, trh oceňuje firmu iracionálně nízko (dostáváte růst zdarma)."
+    ),
+    "PEG Model": (
+        "Peter Lynch: 'Férově oceněná růstová firma má P/E rovné tempu růstu zisků.' "
+        "(tzn. PEG = 1.0). Vhodné pro firmy rostoucí 10-25 % ročně. "
+        "Nevhodné pro pomalé giganty nebo cyklické sektory."
+    ),
+    "Forward PEG (růstový)": (
+        "Model pro rychle rostoucí firmy (fintech, tech v přechodu do zisku). "
+        "Používá forward EPS a normalizuje extrémní růst na udržitelnou úroveň. "
+        "PEG 1.0 = růst je férově oceněn. Zahrnuje i 2letý výhled s diskontem."
+    ),
+}
+
 
 def _graham_valuation(data: dict) -> Optional[dict]:
     """
@@ -1102,7 +1190,7 @@ def _graham_valuation(data: dict) -> Optional[dict]:
     return {
         "method": "Grahamovy formule",
         "description": f"Revidovaný vzorec (1974): V = (EPS * (8.5 + 2g) * 4.4) / {bond_yield}",
-        "tooltip": "Klasická formule Benjamina Grahama pro 'vnitřní hodnotu'. Předpokládá, že férové P/E je 8.5 plus dvojnásobek růstu. Model je citlivý na úrokové sazby (Y). Vhodné pro ziskové, stabilní firmy.",
+        "tooltip": _VALUATION_TOOLTIPS["Grahamovy formule"],
         "fairValue": round(fair_value, 2),
         "upside": round(upside, 1),
         "inputs": {
@@ -1116,6 +1204,39 @@ def _graham_valuation(data: dict) -> Optional[dict]:
     }
 
 
+# DCF applicability and growth-rate choice by sector
+_DCF_EXCLUDED_SECTORS = frozenset({"Financial Services", "Real Estate"})
+_DCF_GROWTH_SECTORS = frozenset({"Technology", "Consumer Cyclical", "Communication Services", "Healthcare"})
+
+
+def _dcf_core(
+    fcf_per_share: float, growth: float, discount_rate: float, terminal_growth: float, projection_years: int
+) -> float:
+    """
+    Numeric kernel of _dcf_valuation (plain floats in, fair value per share out).
+    """
+    total_pv = 0.0
+    projected_fcf = fcf_per_share
+    # Discount factor 1 / (1 + r)^year, accumulated by multiplication instead of pow()
+    inv_discount = 1.0 / (1.0 + discount_rate)
+    discount_factor = 1.0
+    
+    # "H-Model" style: Growth fades linearly from current 'growth' to 'terminal_growth' over the period
+    # This prevents overvaluation of companies with temporarily high growth.
+    for year in range(1, projection_years + 1):
+        year_growth = growth - ((growth - terminal_growth) * (year / projection_years))
+        projected_fcf = projected_fcf * (1 + year_growth)
+        discount_factor *= inv_discount
+        total_pv += projected_fcf * discount_factor
+    
+    # Terminal Value (Gordon Growth Method) at end of year 5
+    # Value_term = FCF_5 * (1+g_term) / (r - g_term)
+    terminal_value = (projected_fcf * (1 + terminal_growth)) / (discount_rate - terminal_growth)
+    
+    # Discount Terminal Value back to today
+    return total_pv + terminal_value * discount_factor
+
+
 def _dcf_valuation(data: dict) -> Optional[dict]:
     """
     Discounted Cash Flow (DCF).
@@ -1136,7 +1257,7 @@ def _dcf_valuation(data: dict) -> Optional[dict]:
     # DCF based on FCF is NOT valid for Financial Services (Banks/Insurance)
     # because their "operating cash flow" includes deposits/loans changes.
     # also tricky for Real Estate (REITs use FFO).
-    if sector in ["Financial Services", "Real Estate"]:
+    if sector in _DCF_EXCLUDED_SECTORS:
         return None
 
     fcf = data.get("freeCashflow")
@@ -1161,14 +1282,12 @@ def _dcf_valuation(data: dict) -> Optional[dict]:
     # Solution: For growth-oriented sectors, prefer the HIGHER of the two growth rates.
     # For mature/value sectors, prefer earnings growth as it's more sustainable.
     
-    growth_sectors = ["Technology", "Consumer Cyclical", "Communication Services", "Healthcare"]
-    
     earnings_g = earnings_growth if earnings_growth and earnings_growth > 0 else None
     revenue_g = revenue_growth if revenue_growth and revenue_growth > 0 else None
     
     growth = None
     
-    if sector in growth_sectors:
+    if sector in _DCF_GROWTH_SECTORS:
         # For growth sectors: use the higher of the two (reinvestment story)
         if earnings_g and revenue_g:
             growth = max(earnings_g, revenue_g)
@@ -1203,27 +1322,8 @@ def _dcf_valuation(data: dict) -> Optional[dict]:
     terminal_growth = 0.03  # Long term GDP growth proxy
     projection_years = 5
     
-    # 5. Calculation Loop
-    total_pv = 0
-    projected_fcf = fcf_per_share
-    
-    # "H-Model" style: Growth fades linearly from current 'growth' to 'terminal_growth' over the period
-    # This prevents overvaluation of companies with temporarily high growth.
-    for year in range(1, projection_years + 1):
-        year_growth = growth - ((growth - terminal_growth) * (year / projection_years))
-        projected_fcf = projected_fcf * (1 + year_growth)
-        
-        pv = projected_fcf / ((1 + discount_rate) ** year)
-        total_pv += pv
-    
-    # Terminal Value (Gordon Growth Method) at end of year 5
-    # Value_term = FCF_5 * (1+g_term) / (r - g_term)
-    terminal_value = (projected_fcf * (1 + terminal_growth)) / (discount_rate - terminal_growth)
-    
-    # Discount Terminal Value back to today
-    terminal_pv = terminal_value / ((1 + discount_rate) ** projection_years)
-    
-    fair_value = total_pv + terminal_pv
+    # 5. Projection + terminal value
+    fair_value = _dcf_core(fcf_per_share, growth, discount_rate, terminal_growth, projection_years)
     
     if fair_value <= 0:
         return None
@@ -1244,7 +1344,7 @@ def _dcf_valuation(data: dict) -> Optional[dict]:
     return {
         "method": "DCF (Diskontované CF)",
         "description": f"Projekce FCF na {projection_years} let + terminální hodnota. Diskont {int(discount_rate*100)}%.",
-        "tooltip": "Zlatý standard valuace. Počítá současnou hodnotu všech budoucích volných peněz, které firma vydělá. Nevhodné pro banky a pojišťovny.",
+        "tooltip": _VALUATION_TOOLTIPS["DCF (Diskontované CF)"],
         "fairValue": round(fair_value, 2),
         "upside": round(upside, 1),
         "inputs": {
@@ -1290,7 +1390,7 @@ def _pe_based_valuation(data: dict) -> Optional[dict]:
     if not used_eps or used_eps <= 0 or not price:
         return None
     
-    benchmark = SECTOR_PE_BENCHMARKS.get(sector, {"low": 15, "mid": 20, "high": 25})
+    benchmark = SECTOR_PE_BENCHMARKS.get(sector, DEFAULT_PE_BENCHMARK)
     
     # 2. Calculate Quality Score (0–1)
     # Higher score = company deserves to trade at top of sector P/E range
@@ -1342,7 +1442,7 @@ def _pe_based_valuation(data: dict) -> Optional[dict]:
     return {
         "method": "P/E sektorový",
         "description": f"Férové P/E {fair_pe}× (sektor {benchmark['low']}–{benchmark['high']}, kvalita {int(quality*100)}%) × {eps_type} EPS",
-        "tooltip": "Srovnává firmu s typickými násobky v jejím sektoru. 'Lepší' firmy (vyšší ROE, marže, růst) si zaslouží ocenění na horní hraně sektoru, průměrné uprostřed. Nevhodné pro REITs (používají FFO).",
+        "tooltip": _VALUATION_TOOLTIPS["P/E sektorový"],
         "fairValue": round(fair_value, 2),
         "upside": round(upside, 1),
         "inputs": {
@@ -1381,7 +1481,7 @@ def _analyst_target_valuation(data: dict) -> Optional[dict]:
     return {
         "method": "Analytici (konsenzus)",
         "description": f"Průměrný cíl {num_analysts or '?'} analytiků",
-        "tooltip": "Průměrná cílová cena analytiků z Wall Street. Čím více analytiků pokrývá akcii, tím spolehlivější konsenzus. Nezapomeňte, že analytici mají tendenci být optimističtí.",
+        "tooltip": _VALUATION_TOOLTIPS["Analytici (konsenzus)"],
         "fairValue": round(target, 2),
         "upside": round(upside, 1),
         "inputs": {
@@ -1396,6 +1496,48 @@ def _analyst_target_valuation(data: dict) -> Optional[dict]:
     }
 
 
+# Sector P/B Benchmarks (Typical Range)
+# Source: Industry averages from CFI and Investopedia (2024-2025).
+SECTOR_PB_BENCHMARKS = {
+    "Financial Services": {"low": 0.8, "mid": 1.2, "high": 1.5},
+    "Real Estate": {"low": 0.9, "mid": 1.2, "high": 1.5},
+    "Utilities": {"low": 1.3, "mid": 1.6, "high": 2.0},
+    "Energy": {"low": 1.0, "mid": 1.4, "high": 2.0},
+    "Basic Materials": {"low": 1.2, "mid": 1.5, "high": 2.0},
+    "Industrials": {"low": 1.5, "mid": 2.2, "high": 3.0},
+}
+
+# Asset-light industries within asset-heavy sectors
+# (e.g., Fintech within Financial Services should be excluded)
+_BOOK_VALUE_EXCLUDED_INDUSTRY_KEYWORDS = (
+    "software", "internet", "fintech", "data & stock exchanges",
+    "capital markets", "insurance brokers", "consulting",
+)
+# All keywords in one case-insensitive scan
+_BOOK_VALUE_EXCLUDED_INDUSTRY_RE = re.compile(
+    "|".join(map(re.escape, _BOOK_VALUE_EXCLUDED_INDUSTRY_KEYWORDS)), re.IGNORECASE
+)
+
+
+@lru_cache(maxsize=4096)
+def _book_value_benchmark(sector: Optional[str], industry: Optional[str]) -> Optional[dict]:
+    """Sector P/B benchmark if the model applies to this (sector, industry), else None."""
+    benchmark = SECTOR_PB_BENCHMARKS.get(sector)
+    if not benchmark:
+        # Book Value is not a reliable metric for this sector
+        return None
+    if industry is None:
+        return None
+    if _BOOK_VALUE_EXCLUDED_INDUSTRY_RE.search(industry):
+        return None
+    return benchmark
+
+
+# Book value confidence: balance sheet is the real value vs. volatile asset values
+_BOOK_VALUE_RELIABLE_SECTORS = frozenset({"Financial Services", "Utilities"})
+_BOOK_VALUE_CYCLICAL_SECTORS = frozenset({"Energy", "Basic Materials"})
+
+
 def _book_value_valuation(data: dict) -> Optional[dict]:
     """
     Price-to-Book (P/B) Valuation.
@@ -1420,40 +1562,22 @@ def _book_value_valuation(data: dict) -> Optional[dict]:
     
     Ref: https://www.investopedia.com/terms/b/bookvalue.asp
     """
+    sector = data.get("sector", "")
+    industry = data.get("industry", "")
+
+    # 1-2. Sector P/B benchmark, None for asset-light sectors and industries
+    # (cached per sector/industry, so it is the cheapest rejection)
+    benchmark = _book_value_benchmark(sector, industry)
+    if benchmark is None:
+        return None
+
     book_value = data.get("bookValue")  # Book Value per Share from yfinance
     price_to_book = data.get("priceToBook")  # Current P/B ratio
     price = data.get("price")
-    sector = data.get("sector", "")
-    industry = data.get("industry", "")
     
     if not book_value or book_value <= 0 or not price:
         return None
     
-    # 1. Sector P/B Benchmarks (Typical Range)
-    # Source: Industry averages from CFI and Investopedia (2024-2025).
-    sector_pb_benchmarks = {
-        "Financial Services": {"low": 0.8, "mid": 1.2, "high": 1.5},
-        "Real Estate": {"low": 0.9, "mid": 1.2, "high": 1.5},
-        "Utilities": {"low": 1.3, "mid": 1.6, "high": 2.0},
-        "Energy": {"low": 1.0, "mid": 1.4, "high": 2.0},
-        "Basic Materials": {"low": 1.2, "mid": 1.5, "high": 2.0},
-        "Industrials": {"low": 1.5, "mid": 2.2, "high": 3.0},
-    }
-    
-    benchmark = sector_pb_benchmarks.get(sector)
-    if not benchmark:
-        # Book Value is not a reliable metric for this sector
-        return None
-    
-    # 2. Exclude Asset-Light Industries within asset-heavy sectors
-    # (e.g., Fintech within Financial Services should be excluded)
-    excluded_keywords = [
-        "software", "internet", "fintech", "data & stock exchanges",
-        "capital markets", "insurance brokers", "consulting",
-    ]
-    if any(keyword in industry.lower() for keyword in excluded_keywords):
-        return None
-    
     # 3. Calculate Current P/B
     current_pb = price_to_book if price_to_book else (price / book_value)
     
@@ -1481,9 +1605,9 @@ def _book_value_valuation(data: dict) -> Optional[dict]:
     # Less reliable for cyclical materials/energy (asset write-downs).
     confidence = "medium"
     
-    if sector in ["Financial Services", "Utilities"]:
+    if sector in _BOOK_VALUE_RELIABLE_SECTORS:
         confidence = "high"
-    elif sector in ["Energy", "Basic Materials"]:
+    elif sector in _BOOK_VALUE_CYCLICAL_SECTORS:
         # Cyclical sectors can have volatile asset values
         confidence = "low"
     
@@ -1494,12 +1618,7 @@ def _book_value_valuation(data: dict) -> Optional[dict]:
     return {
         "method": "Účetní hodnota (P/B)",
         "description": f"BV ${book_value:.2f} × {fair_pb:.1f}× P/B. Aktuální P/B {current_pb:.1f}×.",
-        "tooltip": (
-            "Ocenění dle účetní hodnoty (čistá aktiva = Aktiva - Závazky). "
-            "P/B < 1.0 znamená, že akcie stojí MÉNĚ než hodnota aktiv na akcii (potenciální příležitost). "
-            "Smysluplné jen pro banky, pojišťovny, utility a průmysl. "
-            "Pro technologie a služby je irelevantní (jejich hodnota je v IP a lidech, ne v rozvaze)."
-        ),
+        "tooltip": _VALUATION_TOOLTIPS["Účetní hodnota (P/B)"],
         "fairValue": round(fair_value, 2),
         "upside": round(upside, 1),
         "inputs": {
@@ -1514,6 +1633,27 @@ def _book_value_valuation(data: dict) -> Optional[dict]:
     }
 
 
+# CAPM inputs shared by the DDM and EPV models
+_DDM_RISK_FREE = 0.042  # 10Y Treasury ~4.2%
+_EPV_RISK_FREE = 0.04
+_EQUITY_PREMIUM = 0.05
+_MIN_COST_OF_EQUITY = 0.07  # no equity is practically risk-free
+
+
+def _cost_of_equity(beta: Optional[float], risk_free: float) -> float:
+    """CAPM r = RiskFree + Beta * EquityRiskPremium (missing beta = 1.0), floored at 7%."""
+    beta_val = beta if beta else 1.0
+    return max(risk_free + (beta_val * _EQUITY_PREMIUM), _MIN_COST_OF_EQUITY)
+
+
+def _gordon_core(dividend: float, div_growth: float, discount_rate: float) -> Tuple[float, float]:
+    """
+    Numeric kernel of _ddm_valuation: (next-year dividend D1, fair value).
+    """
+    d1 = dividend * (1 + div_growth)
+    return d1, d1 / (discount_rate - div_growth)
+
+
 def _ddm_valuation(data: dict) -> Optional[dict]:
     """
     Dividend Discount Model (Gordon Growth Model).
@@ -1556,17 +1696,8 @@ def _ddm_valuation(data: dict) -> Optional[dict]:
         # If no growth info, assume inflation-matching growth for payers
         div_growth = 0.025 
 
-    # 3. Cost of Equity (r) via CAPM
-    # r = RiskFree + Beta * EquityRiskPremium
-    # Risk Free ~ 4.2% (10Y Treasury), Premium ~ 5.0%
-    beta_val = beta if beta else 1.0
-    risk_free = 0.042
-    equity_premium = 0.05
-    
-    discount_rate = risk_free + (beta_val * equity_premium)
-    
-    # Floor discount rate at 7% (no equity is practically risk-free)
-    discount_rate = max(discount_rate, 0.07)
+    # 3. Cost of Equity (r) via CAPM, floored at 7%
+    discount_rate = _cost_of_equity(beta, _DDM_RISK_FREE)
     
     # Gordon Model Requirement: r > g
     # If expected return is lower than growth, math breaks (infinity value).
@@ -1578,9 +1709,7 @@ def _ddm_valuation(data: dict) -> Optional[dict]:
 
     # 4. Calculation
     # D1 = Next Year Dividend
-    d1 = dividend * (1 + div_growth)
-    
-    fair_value = d1 / (discount_rate - div_growth)
+    d1, fair_value = _gordon_core(dividend, div_growth, discount_rate)
     
     if fair_value <= 0:
         return None
@@ -1608,7 +1737,7 @@ def _ddm_valuation(data: dict) -> Optional[dict]:
     return {
         "method": "Dividendový model",
         "description": f"Gordon Growth: D₁ ${d1:.2f} / (r {discount_rate:.1%} − g {div_growth:.1%})",
-        "tooltip": "Gordonův model oceňuje akcii jako nekonečnou řadu budoucích dividend. Vyžaduje, aby firma dividendu nejen vyplácela, ale aby na ni 'měla' (Payout Ratio < 100%). Ideální pro Utility, Coca-Colu apod.",
+        "tooltip": _VALUATION_TOOLTIPS["Dividendový model"],
         "fairValue": round(fair_value, 2),
         "upside": round(upside, 1),
         "inputs": {
@@ -1623,6 +1752,38 @@ def _ddm_valuation(data: dict) -> Optional[dict]:
     }
 
 
+_EV_EBITDA_EXCLUDED_SECTORS = frozenset({"Financial Services", "Real Estate"})
+
+# Sector typical EV/EBITDA ranges (Historical Averages)
+# Source: Damodaran / CFI benchmarks
+SECTOR_EV_EBITDA_BENCHMARKS = {
+    "Technology": {"low": 15, "mid": 20, "high": 25}, # Tech trades higher
+    "Healthcare": {"low": 12, "mid": 16, "high": 20},
+    "Consumer Cyclical": {"low": 10, "mid": 14, "high": 18},
+    "Consumer Defensive": {"low": 12, "mid": 15, "high": 18},
+    "Industrials": {"low": 9, "mid": 13, "high": 17},
+    "Energy": {"low": 5, "mid": 8, "high": 10}, # Capital intensive, low multiples
+    "Utilities": {"low": 10, "mid": 12, "high": 15},
+    "Basic Materials": {"low": 6, "mid": 9, "high": 12},
+    "Communication Services": {"low": 10, "mid": 15, "high": 20},
+}
+# If sector unknown, default to broad market avg ~14x
+DEFAULT_EV_EBITDA_BENCHMARK = {"low": 10, "mid": 14, "high": 18}
+
+
+def _ev_ebitda_core(
+    ev_ebitda: float, enterprise_value: float, shares: float, price: float, fair_multiple: float
+) -> Tuple[float, float, float, float]:
+    """
+    Numeric kernel of _ev_ebitda_valuation: (implied EBITDA, net debt, fair
+    equity, fair value per share).
+    """
+    ebitda = enterprise_value / ev_ebitda
+    net_debt = enterprise_value - price * shares
+    fair_equity = ebitda * fair_multiple - net_debt
+    return ebitda, net_debt, fair_equity, fair_equity / shares
+
+
 def _ev_ebitda_valuation(data: dict) -> Optional[dict]:
     """
     EV/EBITDA Valuation.
@@ -1644,59 +1805,35 @@ def _ev_ebitda_valuation(data: dict) -> Optional[dict]:
     
     Ref: https://corporatefinanceinstitute.com/resources/valuation/ev-ebitda/
     """
-    ev_ebitda = data.get("enterpriseToEbitda")
-    enterprise_value = data.get("enterpriseValue")
-    shares = data.get("sharesOutstanding")
-    price = data.get("price")
     sector = data.get("sector")
 
-    if not ev_ebitda or ev_ebitda <= 0 or not enterprise_value or not shares or not price:
-        return None
-
     # 1. Applicability Check
     # Financials: Interest is core business, not excluded from EBITDA -> model invalid.
     # Real Estate: Depreciation is huge but not real cash expense -> use FFO/AFFO -> model invalid.
-    if sector in ["Financial Services", "Real Estate"]:
+    if sector in _EV_EBITDA_EXCLUDED_SECTORS:
         return None
 
-    # Sector typical EV/EBITDA ranges (Historical Averages)
-    # Source: Damodaran / CFI benchmarks
-    sector_ev_ebitda = {
-        "Technology": {"low": 15, "mid": 20, "high": 25}, # Tech trades higher
-        "Healthcare": {"low": 12, "mid": 16, "high": 20},
-        "Consumer Cyclical": {"low": 10, "mid": 14, "high": 18},
-        "Consumer Defensive": {"low": 12, "mid": 15, "high": 18},
-        "Industrials": {"low": 9, "mid": 13, "high": 17},
-        "Energy": {"low": 5, "mid": 8, "high": 10}, # Capital intensive, low multiples
-        "Utilities": {"low": 10, "mid": 12, "high": 15},
-        "Basic Materials": {"low": 6, "mid": 9, "high": 12},
-        "Communication Services": {"low": 10, "mid": 15, "high": 20},
-    }
+    ev_ebitda = data.get("enterpriseToEbitda")
+    enterprise_value = data.get("enterpriseValue")
+    shares = data.get("sharesOutstanding")
+    price = data.get("price")
 
-    benchmarks = sector_ev_ebitda.get(sector)
-    # If sector unknown, default to broad market avg ~14x
-    if not benchmarks:
-        benchmarks = {"low": 10, "mid": 14, "high": 18}
+    if not ev_ebitda or ev_ebitda <= 0 or not enterprise_value or not shares or not price:
+        return None
 
-    # 2. Derive implied Metrics
-    # We back-calculate EBITDA to be consistent with the provided EV and Ratio
-    ebitda = enterprise_value / ev_ebitda
+    benchmarks = SECTOR_EV_EBITDA_BENCHMARKS.get(sector, DEFAULT_EV_EBITDA_BENCHMARK)
 
-    market_cap = price * shares
-    net_debt = enterprise_value - market_cap
-    
-    # 3. Calculate Fair Value
-    # Using 'mid' benchmark as baseline fair value
+    # 2. Derive implied Metrics and Fair Value
+    # EBITDA is back-calculated to be consistent with the provided EV and Ratio;
+    # net debt = EV - market cap. The 'mid' benchmark is the baseline fair multiple.
     fair_multiple = benchmarks["mid"]
-    
-    fair_ev = ebitda * fair_multiple
-    fair_equity = fair_ev - net_debt
+    ebitda, net_debt, fair_equity, fair_value = _ev_ebitda_core(
+        ev_ebitda, enterprise_value, shares, price, fair_multiple
+    )
     
     # If debt is huge, fair_equity might be negative (company is distressed/bankrupt)
     if fair_equity <= 0:
         return None
-        
-    fair_value = fair_equity / shares
 
     if fair_value <= 0:
         return None
@@ -1721,7 +1858,7 @@ def _ev_ebitda_valuation(data: dict) -> Optional[dict]:
     return {
         "method": "EV/EBITDA",
         "description": f"Target EV/EBITDA {fair_multiple:.0f}x (Sektor). Odvozené EBITDA ${ebitda/1e9:.1f}B.",
-        "tooltip": "Oceňuje firmu jako celek (včetně dluhu) oproti jejímu provoznímu zisku (EBITDA). Ideální pro průmysl, energie a utility, protože očišťuje vliv zadlužení a daní. Nevhodné pro banky.",
+        "tooltip": _VALUATION_TOOLTIPS["EV/EBITDA"],
         "fairValue": round(fair_value, 2),
         "upside": round(upside, 1),
         "inputs": {
@@ -1736,6 +1873,10 @@ def _ev_ebitda_valuation(data: dict) -> Optional[dict]:
     }
 
 
+# EPV assumes no growth, so it is hidden sooner for growth sectors
+_EPV_GROWTH_SECTORS = frozenset({"Technology", "Communication Services", "Consumer Cyclical"})
+
+
 def _epv_valuation(data: dict) -> Optional[dict]:
     """
     Earnings Power Value (Bruce Greenwald).
@@ -1753,9 +1894,7 @@ def _epv_valuation(data: dict) -> Optional[dict]:
 
     # 1. Cost of equity (Discount Rate)
     # EPV ignores growth, so we just want the cost to maintain current earnings.
-    risk_free = 0.04
-    equity_premium = 0.05
-    r = max(risk_free + beta * equity_premium, 0.07)  # Floor at 7%
+    r = _cost_of_equity(beta, _EPV_RISK_FREE)
 
     # 2. Normalized Earnings Estimate
     # Ideally should adjust for cycle. We use current EPS but handle cyclicals conservatively.
@@ -1775,7 +1914,7 @@ def _epv_valuation(data: dict) -> Optional[dict]:
     # 3. Applicability Logic & Filtering
     # EPV is often very low for high growth stocks (Tech, Biotech) because it assumes NO growth.
     # Showing a -70% valuations for Amazon/NVIDIA is confusing for users.
-    is_growth_sector = sector in ["Technology", "Communication Services", "Consumer Cyclical"]
+    is_growth_sector = sector in _EPV_GROWTH_SECTORS
     
     # Filter 1: Hide if massively negative for growth sectors (it's not a useful floor if it's irrelevant)
     if is_growth_sector and upside < -50:
@@ -1801,11 +1940,7 @@ def _epv_valuation(data: dict) -> Optional[dict]:
         "method": "Výnosová síla (EPV)",
         # CZ: "Conservative value without growth"
         "description": f"Normalizovaný zisk ${normalized_earnings:.2f} / {r:.1%} náklad kapitálu (bez růstu)",
-        "tooltip": (
-            "Model dle Bruce Greenwalda. Ukazuje hodnotu firmy za předpokladu, že už nikdy neporoste "
-            "a bude jen udržovat současné zisky (Zero Growth). Je to 'tvrdá podlaha' hodnoty. "
-            "Pokud je cena akcie pod touto hodnotou, trh oceňuje firmu iracionálně nízko (dostáváte růst zdarma)."
-        ),
+        "tooltip": _VALUATION_TOOLTIPS["Výnosová síla (EPV)"],
         "fairValue": round(fair_value, 2),
         "upside": round(upside, 1),
         "inputs": {
@@ -1820,12 +1955,22 @@ def _epv_valuation(data: dict) -> Optional[dict]:
     }
 
 
+# Cyclicals and financials trade at PEG < 1 without being undervalued
+_PEG_EXCLUDED_SECTORS = frozenset({"Financial Services", "Energy", "Utilities", "Real Estate", "Basic Materials"})
+
+
 def _peg_valuation(data: dict) -> Optional[dict]:
     """
     PEG Ratio Valuation (Peter Lynch's Rule of Thumb).
     Fair Value = Trailing EPS * (Growth Rate * 100).
     Basically assumes Fair PEG = 1.0.
     """
+    # Rule B: Exclude Cyclicals and Financials
+    # Banks often trade at PEG < 1 naturally without being undervalued.
+    sector = data.get("sector", "")
+    if sector in _PEG_EXCLUDED_SECTORS:
+        return None
+
     eps = data.get("eps")
     forward_eps = data.get("forwardEps")
     price = data.get("price")
@@ -1857,12 +2002,6 @@ def _peg_valuation(data: dict) -> Optional[dict]:
     if growth_pct < 8 or growth_pct > 40:
         return None
 
-    # Rule B: Exclude Cyclicals and Financials
-    # Banks often trade at PEG < 1 naturally without being undervalued.
-    sector = data.get("sector", "")
-    if sector in ["Financial Services", "Energy", "Utilities", "Real Estate", "Basic Materials"]:
-        return None
-
     # 3. Valuation
     # Fair P/E = Growth Rate (PEG = 1.0)
     fair_pe = growth_pct
@@ -1883,11 +2022,7 @@ def _peg_valuation(data: dict) -> Optional[dict]:
     return {
         "method": "PEG Model",
         "description": f"Férové P/E {fair_pe:.1f}x = Oček. růst {growth_pct:.1f}%",
-        "tooltip": (
-            "Peter Lynch: 'Férově oceněná růstová firma má P/E rovné tempu růstu zisků.' "
-            "(tzn. PEG = 1.0). Vhodné pro firmy rostoucí 10-25 % ročně. "
-            "Nevhodné pro pomalé giganty nebo cyklické sektory."
-        ),
+        "tooltip": _VALUATION_TOOLTIPS["PEG Model"],
         "fairValue": round(fair_value, 2),
         "upside": round(upside, 1),
         "inputs": {
@@ -1901,6 +2036,21 @@ def _peg_valuation(data: dict) -> Optional[dict]:
     }
 
 
+# Forward PEG growth normalization: bisect_left(_GROWTH_PHASE_BOUNDS, growth %)
+# picks the phase, since each band's lower bound is exclusive
+_GROWTH_PHASE_BOUNDS = (40, 50, 80)
+_GROWTH_PHASES = (
+    # 25-40%: use as-is
+    ("stable", lambda g: g),
+    # Strong growth - slight cap
+    ("strong", lambda g: min(g, 45)),
+    # High growth - moderate normalization
+    ("high_growth", lambda g: min(g * 0.8, 50)),
+    # Extreme growth (turnaround, first profitable year) - normalize heavily, this won't sustain
+    ("turnaround", lambda g: 45),
+)
+
+
 def _forward_peg_valuation(data: dict) -> Optional[dict]:
     """
     Forward PEG Valuation for High-Growth Companies (incl. Fintech).
@@ -1960,23 +2110,8 @@ def _forward_peg_valuation(data: dict) -> Optional[dict]:
     # - If growth 40-60%: Strong growth phase. Use as-is but cap at 50%.
     # - If growth 25-40%: GARP sweet spot. Use as-is.
     
-    normalized_growth = growth_pct
-    growth_phase = "stable"
-    
-    if growth_pct > 80:
-        # Extreme growth (turnaround, first profitable year)
-        # Normalize heavily - this won't sustain
-        normalized_growth = 45
-        growth_phase = "turnaround"
-    elif growth_pct > 50:
-        # High growth - moderate normalization
-        normalized_growth = min(growth_pct * 0.8, 50)
-        growth_phase = "high_growth"
-    elif growth_pct > 40:
-        # Strong growth - slight cap
-        normalized_growth = min(growth_pct, 45)
-        growth_phase = "strong"
-    # else: 25-40% - use as-is
+    growth_phase, normalize = _GROWTH_PHASES[bisect_left(_GROWTH_PHASE_BOUNDS, growth_pct)]
+    normalized_growth = normalize(growth_pct)
     
     # 5. Calculate Fair P/E using PEG = 1.0
     # Fair P/E = Normalized Growth Rate
@@ -2017,16 +2152,12 @@ def _forward_peg_valuation(data: dict) -> Optional[dict]:
     
     # Sector bonus: Fintech with proven growth gets medium minimum
     if sector == "Financial Services" and growth_pct > 40:
-        confidence = max(confidence, "medium")
+        confidence = max(confidence, "medium", key=_CONFIDENCE_WEIGHTS.get)
     
     return {
         "method": "Forward PEG (růstový)",
         "description": f"Forward EPS ${forward_eps:.2f} × norm. růst {normalized_growth:.0f}% (PEG 1.0)",
-        "tooltip": (
-            "Model pro rychle rostoucí firmy (fintech, tech v přechodu do zisku). "
-            "Používá forward EPS a normalizuje extrémní růst na udržitelnou úroveň. "
-            "PEG 1.0 = růst je férově oceněn. Zahrnuje i 2letý výhled s diskontem."
-        ),
+        "tooltip": _VALUATION_TOOLTIPS["Forward PEG (růstový)"],
         "fairValue": round(fair_value, 2),
         "upside": round(upside, 1),
         "inputs": {
@@ -2045,6 +2176,28 @@ def _forward_peg_valuation(data: dict) -> Optional[dict]:
     }
 
 
+# Confidence labels, ascending
+CONFIDENCE_LEVELS = ("low", "medium", "high")
+# Composite weights: high confidence = 3, medium = 2, low = 1
+_CONFIDENCE_WEIGHTS = {level: weight for weight, level in enumerate(CONFIDENCE_LEVELS, 1)}
+
+
+# Valuation models in output order, each with the payload keys it returns
+# None without; price is checked up front
+_VALUATION_MODELS = (
+    (_graham_valuation, ("eps",)),
+    (_dcf_valuation, ("freeCashflow", "sharesOutstanding")),
+    (_pe_based_valuation, ()),  # forward or trailing EPS
+    (_peg_valuation, ("eps",)),
+    (_forward_peg_valuation, ("forwardEps",)),
+    (_ddm_valuation, ("dividendRate",)),
+    (_ev_ebitda_valuation, ("enterpriseToEbitda", "enterpriseValue", "sharesOutstanding")),
+    (_epv_valuation, ("eps",)),
+    (_analyst_target_valuation, ("targetMeanPrice",)),
+    (_book_value_valuation, ("bookValue",)),
+)
+
+
 def calculate_valuation(data: dict) -> dict:
     """
     Run all applicable valuation models and return composite result.
@@ -2055,19 +2208,10 @@ def calculate_valuation(data: dict) -> dict:
     
     models = []
     
-    # Run each model, collect non-None results
-    for model_fn in [
-        _graham_valuation,
-        _dcf_valuation,
-        _pe_based_valuation,
-        _peg_valuation,
-        _forward_peg_valuation,
-        _ddm_valuation,
-        _ev_ebitda_valuation,
-        _epv_valuation,
-        _analyst_target_valuation,
-        _book_value_valuation,
-    ]:
+    # Run each model that has its inputs, collect non-None results
+    for model_fn, required in _VALUATION_MODELS:
+        if not all(map(data.get, required)):
+            continue
         try:
             result = model_fn(data)
             if result:
@@ -2079,16 +2223,14 @@ def calculate_valuation(data: dict) -> dict:
     if not models:
         return {"models": [], "composite": None}
     
-    # Calculate composite fair value (weighted average)
-    # Weights: high confidence = 3, medium = 2, low = 1
-    confidence_weights = {"high": 3, "medium": 2, "low": 1}
-    total_weight = 0
-    weighted_sum = 0
-    
-    for m in models:
-        w = confidence_weights.get(m["confidence"], 1)
-        weighted_sum += m["fairValue"] * w
-        total_weight += w
+    # Calculate composite fair value (confidence-weighted average)
+    weighted = [
+        (m["fairValue"], _CONFIDENCE_WEIGHTS.get(m["confidence"], 1))
+        for m in models
+        if m.get("fairValue") is not None
+    ]
+    total_weight = sum(w for _, w in weighted)
+    weighted_sum = sum(value * w for value, w in weighted)
     
     composite_value = weighted_sum / total_weight if total_weight > 0 else None
     composite_upside = ((composite_value / price) - 1) * 100 if composite_value else None
@@ -2111,7 +2253,7 @@ def calculate_valuation(data: dict) -> dict:
         "fairValue": round(composite_value, 2) if composite_value else None,
         "upside": round(composite_upside, 1) if composite_upside is not None else None,
         "signal": signal,
-        "modelsUsed": len(models),
+        "modelsUsed": len(weighted),
     }
     
     return {
@@ -2122,93 +2264,235 @@ def calculate_valuation(data: dict) -> dict:
     }
 
 
+# (payload key, yfinance .info key), in payload order
+_INFO_FIELDS = (
+    ("sector", "sector"),
+    ("industry", "industry"),
+    ("country", "country"),
+    ("exchange", "exchange"),
+    ("currency", "currency"),
+    ("description", "longBusinessSummary"),
+
+    # Price data
+    ("price", "regularMarketPrice"),
+    ("previousClose", "regularMarketPreviousClose"),
+    ("change", "regularMarketChange"),
+    ("changePercent", "regularMarketChangePercent"),
+    ("dayHigh", "dayHigh"),
+    ("dayLow", "dayLow"),
+    ("fiftyTwoWeekHigh", "fiftyTwoWeekHigh"),
+    ("fiftyTwoWeekLow", "fiftyTwoWeekLow"),
+    ("volume", "volume"),
+    ("avgVolume", "averageVolume"),
+
+    # Valuation metrics
+    ("marketCap", "marketCap"),
+    ("enterpriseValue", "enterpriseValue"),
+    ("trailingPE", "trailingPE"),
+    ("forwardPE", "forwardPE"),
+    ("pegRatio", "pegRatio"),
+    ("priceToBook", "priceToBook"),
+    ("priceToSales", "priceToSalesTrailing12Months"),
+    ("enterpriseToRevenue", "enterpriseToRevenue"),
+    ("enterpriseToEbitda", "enterpriseToEbitda"),
+
+    # Fundamentals
+    ("revenue", "totalRevenue"),
+    ("revenueGrowth", "revenueGrowth"),
+    ("grossMargin", "grossMargins"),
+    ("operatingMargin", "operatingMargins"),
+    ("profitMargin", "profitMargins"),
+    ("eps", "trailingEps"),
+    ("forwardEps", "forwardEps"),
+    ("roe", "returnOnEquity"),
+    ("roa", "returnOnAssets"),
+    ("debtToEquity", "debtToEquity"),
+    ("currentRatio", "currentRatio"),
+    ("quickRatio", "quickRatio"),
+    ("freeCashflow", "freeCashflow"),
+    ("bookValue", "bookValue"),
+    ("sharesOutstanding", "sharesOutstanding"),
+    ("earningsGrowth", "earningsGrowth"),
+
+    # Dividends
+    ("dividendYield", "dividendYield"),
+    ("dividendRate", "dividendRate"),
+    ("payoutRatio", "payoutRatio"),
+    ("beta", "beta"),
+
+    # Analyst targets
+    ("targetHighPrice", "targetHighPrice"),
+    ("targetLowPrice", "targetLowPrice"),
+    ("targetMeanPrice", "targetMeanPrice"),
+    ("recommendationKey", "recommendationKey"),
+    ("numberOfAnalystOpinions", "numberOfAnalystOpinions"),
+)
+
+# ±10% spread on stock info freshness and expiry, so tickers cached in one
+# burst don't go stale (and refetch from Yahoo) in the same instant
+_STOCK_INFO_TTL_JITTER = 0.1
+
+# Stock info fetches currently in progress, keyed by ticker. The task is the
+# strong reference; callers await it through asyncio.shield.
+_inflight: dict[str, asyncio.Task] = {}
+# Strong references to background refresh tasks (the loop only keeps weak ones)
+_refresh_tasks: set[asyncio.Task] = set()
+
+# In-process copy of recently served payloads in front of Redis:
+# ticker -> (monotonic expiry, payload). Callers get shallow copies, so
+# a caller setting or dropping keys doesn't change what the next one sees.
+_LOCAL_CACHE_TTL = 30
+_LOCAL_CACHE_MAX = 1024
+_local_cache: dict[str, tuple[float, dict]] = {}
+
+
+# Dedicated pool for blocking .info fetches so slow Yahoo responses can't
+# starve the default executor used by other to_thread calls
+_info_executor = ThreadPoolExecutor(max_workers=8, thread_name_prefix="stock-info")
+
+
+def _fetch_info_sync(ticker: str) -> dict:
+    """Blocking yfinance .info fetch — run in _info_executor."""
+    return yf.Ticker(ticker).info
+
+
 async def get_stock_info(redis, ticker: str) -> Optional[dict]:
     """
     Get detailed stock info including fundamentals and valuation metrics.
     Uses yfinance .info which includes everything we need.
+
+    Stale-while-revalidate: entries older than STOCK_INFO are still served
+    (up to STOCK_INFO_STALE) while a background task refetches them.
     """
-    cache_key = f"stock_info:{ticker}"
-    cached = await redis.get(cache_key)
+    local = _local_get(ticker)
+    if local is not None:
+        return local
+
+    cached = await redis.get(f"stock_info:{ticker}")
     if cached:
-        return json.loads(cached)
+        return _local_put(ticker, _unwrap_cached(redis, ticker, cached))
+
+    return await _fetch_coalesced(redis, ticker)
 
+
+def _local_get(ticker: str) -> Optional[dict]:
+    entry = _local_cache.get(ticker)
+    if entry is None or entry[0] <= time.monotonic():
+        return None
+    return dict(entry[1])
+
+
+def _local_put(ticker: str, data: Optional[dict]) -> Optional[dict]:
+    """Remember a payload for _LOCAL_CACHE_TTL seconds; returns it unchanged."""
+    if data is None:
+        return None
+    now = time.monotonic()
+    if ticker not in _local_cache and len(_local_cache) >= _LOCAL_CACHE_MAX:
+        for key in [key for key, (expires, _) in _local_cache.items() if expires <= now]:
+            del _local_cache[key]
+        if len(_local_cache) >= _LOCAL_CACHE_MAX:
+            # Oldest insertion first
+            del _local_cache[next(iter(_local_cache))]
+    _local_cache[ticker] = (now + _LOCAL_CACHE_TTL, dict(data))
+    return data
+
+
+def _unwrap_cached(redis, ticker: str, cached: bytes) -> Optional[dict]:
+    """Decode a cache entry, scheduling a background refresh if it is stale."""
+    entry = orjson.loads(cached)
+    if "fetched_at" not in entry:
+        # Legacy entry written without the envelope
+        return _restore_tooltips(entry)
+    if entry["data"] is None:
+        # Negative entry: Yahoo had no price for this ticker
+        return None
+    stale_at = entry.get("stale_at", entry["fetched_at"] + CacheTTL.STOCK_INFO)
+    if time.time() >= stale_at and ticker not in _inflight:
+        task = asyncio.create_task(_refresh_stock_info(redis, ticker))
+        _refresh_tasks.add(task)
+        task.add_done_callback(_refresh_tasks.discard)
+    return _restore_tooltips(entry["data"])
+
+
+def _jittered(ttl: float) -> float:
+    return ttl * random.uniform(1 - _STOCK_INFO_TTL_JITTER, 1 + _STOCK_INFO_TTL_JITTER)
+
+
+def _without_tooltips(payload: dict) -> dict:
+    """Copy of the payload for Redis, minus the static valuation tooltips."""
+    valuation = payload.get("valuation")
+    if not valuation or not valuation.get("models"):
+        return payload
+    models = [{k: v for k, v in model.items() if k != "tooltip"} for model in valuation["models"]]
+    return {**payload, "valuation": {**valuation, "models": models}}
+
+
+def _restore_tooltips(payload: dict) -> dict:
+    """Put the _VALUATION_TOOLTIPS text back into a payload read from Redis."""
+    valuation = payload.get("valuation") or {}
+    for model in valuation.get("models") or ():
+        tooltip = _VALUATION_TOOLTIPS.get(model.get("method"))
+        if tooltip is not None:
+            model.setdefault("tooltip", tooltip)
+    return payload
+
+
+async def _refresh_stock_info(redis, ticker: str) -> None:
+    """Background refresh of a stale cache entry; failures keep the stale copy."""
     try:
-        t = yf.Ticker(ticker)
-        info = t.info
+        await _fetch_coalesced(redis, ticker)
+    except Exception as e:
+        logger.warning("Background stock info refresh failed for %s: %s", ticker, e)
+
+
+async def _fetch_coalesced(redis, ticker: str) -> Optional[dict]:
+    """
+    Single-flight: concurrent misses for the same ticker share one fetch task.
+    Every caller (the first one included) awaits it shielded, so a cancelled
+    caller doesn't abort the fetch the others are waiting on.
+    """
+    task = _inflight.get(ticker)
+    if task is None:
+        task = asyncio.create_task(_fetch_stock_info(redis, ticker))
+        _inflight[ticker] = task
+        task.add_done_callback(partial(_inflight_done, ticker))
+    return await asyncio.shield(task)
+
+
+def _inflight_done(ticker: str, task: asyncio.Task) -> None:
+    _inflight.pop(ticker, None)
+    if not task.cancelled():
+        task.exception()  # mark retrieved in case every caller was cancelled
+
+
+async def _fetch_stock_info(redis, ticker: str) -> Optional[dict]:
+    """Fetch .info from yfinance, build the stock info payload and cache it."""
+    cache_key = f"stock_info:{ticker}"
+    try:
+        loop = asyncio.get_running_loop()
+        info = await loop.run_in_executor(_info_executor, _fetch_info_sync, ticker)
         
         if not info or info.get("regularMarketPrice") is None:
+            # Unknown or delisted ticker: remember briefly so repeat lookups skip Yahoo.
+            # nx: a background refresh must not replace a stale but valid entry.
+            entry = {"data": None, "fetched_at": time.time()}
+            await redis.set(cache_key, orjson.dumps(entry), ex=CacheTTL.STOCK_INFO_NOT_FOUND, nx=True)
             return None
         
         # Extract key metrics
         result = {
             "symbol": ticker,
             "name": info.get("longName") or info.get("shortName"),
-            "sector": info.get("sector"),
-            "industry": info.get("industry"),
-            "country": info.get("country"),
-            "exchange": info.get("exchange"),
-            "currency": info.get("currency"),
-            "description": info.get("longBusinessSummary"),
-            
-            # Price data
-            "price": info.get("regularMarketPrice"),
-            "previousClose": info.get("regularMarketPreviousClose"),
-            "change": info.get("regularMarketChange"),
-            "changePercent": info.get("regularMarketChangePercent"),
-            "dayHigh": info.get("dayHigh"),
-            "dayLow": info.get("dayLow"),
-            "fiftyTwoWeekHigh": info.get("fiftyTwoWeekHigh"),
-            "fiftyTwoWeekLow": info.get("fiftyTwoWeekLow"),
-            "volume": info.get("volume"),
-            "avgVolume": info.get("averageVolume"),
-            
-            # Valuation metrics
-            "marketCap": info.get("marketCap"),
-            "enterpriseValue": info.get("enterpriseValue"),
-            "trailingPE": info.get("trailingPE"),
-            "forwardPE": info.get("forwardPE"),
-            "pegRatio": info.get("pegRatio"),
-            "priceToBook": info.get("priceToBook"),
-            "priceToSales": info.get("priceToSalesTrailing12Months"),
-            "enterpriseToRevenue": info.get("enterpriseToRevenue"),
-            "enterpriseToEbitda": info.get("enterpriseToEbitda"),
-            
-            # Fundamentals
-            "revenue": info.get("totalRevenue"),
-            "revenueGrowth": info.get("revenueGrowth"),
-            "grossMargin": info.get("grossMargins"),
-            "operatingMargin": info.get("operatingMargins"),
-            "profitMargin": info.get("profitMargins"),
-            "eps": info.get("trailingEps"),
-            "forwardEps": info.get("forwardEps"),
-            "roe": info.get("returnOnEquity"),
-            "roa": info.get("returnOnAssets"),
-            "debtToEquity": info.get("debtToEquity"),
-            "currentRatio": info.get("currentRatio"),
-            "quickRatio": info.get("quickRatio"),
-            "freeCashflow": info.get("freeCashflow"),
-            "bookValue": info.get("bookValue"),
-            "sharesOutstanding": info.get("sharesOutstanding"),
-            "earningsGrowth": info.get("earningsGrowth"),
-            
-            # Dividends
-            # yfinance vrací dividendYield UŽ jako procento (např. 2.76 = 2,76 %),
-            # ale celý kód s ním pracuje jako se zlomkem (×100 na zobrazení, zlomkové
-            # prahy v insights). Normalizujeme na zlomek tady — jediný zdroj pravdy.
-            "dividendYield": (info.get("dividendYield") / 100) if info.get("dividendYield") is not None else None,
-            "dividendRate": info.get("dividendRate"),
-            "payoutRatio": info.get("payoutRatio"),
-            "beta": info.get("beta"),
-            
-            # Analyst targets
-            "targetHighPrice": info.get("targetHighPrice"),
-            "targetLowPrice": info.get("targetLowPrice"),
-            "targetMeanPrice": info.get("targetMeanPrice"),
-            "recommendationKey": info.get("recommendationKey"),
-            "numberOfAnalystOpinions": info.get("numberOfAnalystOpinions"),
-
-            "lastUpdated": str(pd.Timestamp.now()),
         }
+        result.update({out: info.get(src) for out, src in _INFO_FIELDS})
+
+        # yfinance vrací dividendYield UŽ jako procento (např. 2.76 = 2,76 %),
+        # ale celý kód s ním pracuje jako se zlomkem (×100 na zobrazení, zlomkové
+        # prahy v insights). Normalizujeme na zlomek tady — jediný zdroj pravdy.
+        if result["dividendYield"] is not None:
+            result["dividendYield"] /= 100
+
+        result["lastUpdated"] = datetime.now(timezone.utc).isoformat()
 
         result.update(_extract_officers(info))
         
@@ -2222,8 +2506,14 @@ async def get_stock_info(redis, ticker: str) -> Optional[dict]:
         # Calculate fair value estimates
         result["valuation"] = calculate_valuation(result)
         
-        await redis.set(cache_key, json.dumps(result), ex=CacheTTL.STOCK_INFO)
-        return result
+        now = time.time()
+        entry = {
+            "data": _without_tooltips(result),
+            "fetched_at": now,
+            "stale_at": now + _jittered(CacheTTL.STOCK_INFO),
+        }
+        await redis.set(cache_key, orjson.dumps(entry), ex=round(_jittered(CacheTTL.STOCK_INFO_STALE)))
+        return _local_put(ticker, result)
         
     except Exception as e:
         error_text = str(e).lower()
@@ -1,16 +1,222 @@
 """
 Technical indicators calculation and signals generation
 """
+import asyncio
 import numpy as np
 import yfinance as yf
 import pandas as pd
-import json
 import logging
-from typing import List, Dict, Optional
+from bisect import bisect_right
+import orjson
+from typing import List, Dict, Optional, Tuple
 from app.core.cache import CacheTTL
+from .quotes import _normalize_ticker_data
 
 logger = logging.getLogger(__name__)
 
+# Strong references to background period prebuilds (the loop only keeps weak ones)
+_prebuild_tasks: set[asyncio.Task] = set()
+
+# Supported chart periods -> trading rows taken from the 2y frame
+_PERIOD_DAYS = {
+    "1w": 7,
+    "1mo": 30,
+    "3mo": 90,
+    "6mo": 180,
+    "1y": 365,
+    "2y": 730,
+}
+
+
+def _pack_history(df: pd.DataFrame) -> bytes:
+    """
+    Serialize the indicator frame column-wise for Redis.
+    Dates are stored as UTC epoch nanoseconds, NaN becomes null.
+    """
+    columns = {}
+    for col in df.columns:
+        if col == 'date':
+            dates = pd.to_datetime(df['date'], utc=True).dt.as_unit('ns')
+            columns['date'] = dates.astype('int64').tolist()
+        else:
+            columns[col] = df[col].tolist()
+    return orjson.dumps(columns)
+
+
+def _unpack_history(cached) -> pd.DataFrame:
+    """Rebuild the frame written by _pack_history (UTC dates, float columns)."""
+    data = orjson.loads(cached)
+    return pd.DataFrame({
+        col: pd.to_datetime(values, unit='ns', utc=True) if col == 'date'
+        else np.array(values, dtype=np.float64)
+        for col, values in data.items()
+    })
+
+
+# Numeric columns rendered into the chart history arrays
+_HISTORY_COLUMNS = (
+    'close', 'high', 'low', 'sma50', 'sma200', 'rsi14',
+    'macd', 'macd_signal', 'macd_histogram',
+    'bb_upper', 'bb_middle', 'bb_lower', 'stoch_k', 'stoch_d',
+    'atr14', 'atr_percent', 'obv', 'obv_sma',
+    'adx', 'plus_di', 'minus_di', 'volume_sma20',
+)
+
+
+def _rounded_columns(df: pd.DataFrame, columns) -> Dict[str, list]:
+    """
+    Round whole columns to 4 decimals, NaN -> None, as plain lists ready for JSON.
+    Uses built-in round() on the extracted floats (np.round differs on decimal ties).
+    """
+    rounded = {}
+    for col in columns:
+        values = df[col].to_numpy(dtype=np.float64).tolist()
+        rounded[col] = [round(v, 4) if v == v else None for v in values]
+    return rounded
+
+
+def _compute_indicators(hist: pd.DataFrame) -> pd.DataFrame:
+    """
+    Calculate all indicator columns on raw yfinance daily history.
+    Pure CPU work, runs in a worker thread.
+    """
+    # reset_index already returns a new frame, hist is left untouched
+    df = hist.reset_index()
+    df.columns = df.columns.str.lower()
+    
+    # Rename 'date' column if needed
+    if 'date' not in df.columns and 'datetime' not in df.columns:
+        df = df.rename(columns={df.columns[0]: 'date'})
+    # Same UTC dates as a frame read back from the cache, so every
+    # period built from this frame matches one built after an L1 hit
+    df['date'] = pd.to_datetime(df['date'], utc=True)
+    
+    # ============================================================
+    # CALCULATE ALL INDICATORS
+    # ============================================================
+    
+    # SMA (Simple Moving Average)
+    df['sma50'] = df['close'].rolling(window=50).mean()
+    df['sma200'] = df['close'].rolling(window=200).mean()
+    
+    # RSI (Relative Strength Index)
+    delta = df['close'].diff()
+    gain = delta.where(delta > 0, 0).rolling(window=14).mean()
+    loss = (-delta.where(delta < 0, 0)).rolling(window=14).mean()
+    rs = gain / loss.replace(0, float('nan'))
+    df['rsi14'] = 100 - (100 / (1 + rs))
+    
+    # MACD (Moving Average Convergence Divergence)
+    ema12 = df['close'].ewm(span=12, adjust=False).mean()
+    ema26 = df['close'].ewm(span=26, adjust=False).mean()
+    df['macd'] = ema12 - ema26
+    df['macd_signal'] = df['macd'].ewm(span=9, adjust=False).mean()
+    df['macd_histogram'] = df['macd'] - df['macd_signal']
+    
+    # Bollinger Bands
+    df['bb_middle'] = df['close'].rolling(window=20).mean()
+    bb_std = df['close'].rolling(window=20).std()
+    df['bb_upper'] = df['bb_middle'] + (bb_std * 2)
+    df['bb_lower'] = df['bb_middle'] - (bb_std * 2)
+    
+    # Stochastic Oscillator
+    low14 = df['low'].rolling(window=14).min()
+    high14 = df['high'].rolling(window=14).max()
+    df['stoch_k'] = 100 * ((df['close'] - low14) / (high14 - low14))
+    df['stoch_d'] = df['stoch_k'].rolling(window=3).mean()
+    
+    # ATR (Average True Range)
+    tr1 = df['high'] - df['low']
+    tr2 = (df['high'] - df['close'].shift()).abs()
+    tr3 = (df['low'] - df['close'].shift()).abs()
+    # Element-wise max without a 3-column frame; fmax skips the NaN prev close of the first bar
+    tr = np.fmax(np.fmax(tr1, tr2), tr3)
+    atr14 = tr.rolling(window=14).mean()
+    df['atr14'] = atr14
+    df['atr_percent'] = (atr14 / df['close']) * 100
+    
+    # OBV (On-Balance Volume)
+    direction = np.sign(df['close'].diff()).fillna(0)
+    df['obv'] = (direction * df['volume']).cumsum()
+    df['obv_sma'] = df['obv'].rolling(window=20).mean()
+    
+    # ADX (Average Directional Index)
+    plus_dm = df['high'].diff()
+    minus_dm = df['low'].shift() - df['low']
+    plus_dm = plus_dm.where((plus_dm > minus_dm) & (plus_dm > 0), 0)
+    minus_dm = minus_dm.where((minus_dm > plus_dm) & (minus_dm > 0), 0)
+    
+    # Directional indicators reuse the ATR window computed above
+    plus_di = 100 * (plus_dm.rolling(window=14).mean() / atr14)
+    minus_di = 100 * (minus_dm.rolling(window=14).mean() / atr14)
+    dx = 100 * (abs(plus_di - minus_di) / (plus_di + minus_di))
+    df['adx'] = dx.rolling(window=14).mean()
+    df['plus_di'] = plus_di
+    df['minus_di'] = minus_di
+    
+    # Volume analysis
+    df['volume_sma20'] = df['volume'].rolling(window=20).mean()
+    
+    return df
+
+
+def _fetch_history_sync(ticker: str) -> Optional[pd.DataFrame]:
+    """Blocking 2y history download + indicators — run via asyncio.to_thread."""
+    t = yf.Ticker(ticker)
+    # Get 2 years of history (need ~250 days for SMA200)
+    hist = t.history(period="2y", interval="1d")
+    
+    if hist.empty or len(hist) < 50:
+        return None
+    
+    return _compute_indicators(hist)
+
+
+def _download_histories_sync(tickers: List[str]) -> Dict[str, pd.DataFrame]:
+    """
+    Blocking 2y history for several tickers in one yf.download + indicators
+    for each — run via asyncio.to_thread. Tickers without enough history are left out.
+    """
+    # ignore_tz=False keeps real timestamps, so dates match the single-ticker path
+    data = yf.download(
+        " ".join(tickers),
+        period="2y",
+        interval="1d",
+        auto_adjust=True,
+        ignore_tz=False,
+        progress=False,
+        threads=True,
+    )
+    
+    frames = {}
+    for ticker in tickers:
+        try:
+            hist = _normalize_ticker_data(data, ticker)
+            if hist is None:
+                continue
+            # Batch rows are the union of all trading calendars
+            hist = hist.dropna(subset=["Close"])
+            if len(hist) < 50:
+                continue
+            frames[ticker] = _compute_indicators(hist)
+        except Exception as e:
+            logger.warning(f"Error computing indicators for {ticker}: {e}")
+    return frames
+
+
+def _decode_raw_history(ticker: str, cached) -> Optional[pd.DataFrame]:
+    """Unpack an L1 entry; None for entries in the old row-per-record JSON format."""
+    try:
+        return _unpack_history(cached)
+    except orjson.JSONDecodeError:
+        # Entry written in the old row-per-record JSON format, refetch
+        logger.debug(f"Ignoring legacy raw technical cache for {ticker}")
+        return None
+
+
+async def _store_raw_history(redis, ticker: str, df: pd.DataFrame) -> None:
+    await redis.set(f"raw_technical:{ticker}", _pack_history(df), ex=CacheTTL.TECHNICAL_RAW)
+
 
 async def get_raw_history_with_indicators(redis, ticker: str) -> Optional[pd.DataFrame]:
     """
@@ -19,114 +225,54 @@ async def get_raw_history_with_indicators(redis, ticker: str) -> Optional[pd.Dat
     
     Returns DataFrame with all indicator columns, or None if not available.
     """
+    df, _ = await _load_raw_history(redis, ticker)
+    return df
+
+
+async def _load_raw_history(redis, ticker: str) -> Tuple[Optional[pd.DataFrame], bool]:
+    """
+    Implementation of get_raw_history_with_indicators.
+    Also reports whether the frame was just fetched from yfinance (L1 miss).
+    """
     cache_key = f"raw_technical:{ticker}"
     cached = await redis.get(cache_key)
     
     if cached:
-        # Reconstruct DataFrame from cached JSON
-        data = json.loads(cached)
-        df = pd.DataFrame(data)
-        # Handle mixed timezone issue by converting to UTC
-        df['date'] = pd.to_datetime(df['date'], utc=True)
-        return df
+        df = _decode_raw_history(ticker, cached)
+        if df is not None:
+            return df, False
     
     try:
-        t = yf.Ticker(ticker)
-        # Get 2 years of history (need ~250 days for SMA200)
-        hist = t.history(period="2y", interval="1d")
-        
-        if hist.empty or len(hist) < 50:
-            return None
-        
-        df = hist.copy()
-        df = df.reset_index()
-        df.columns = df.columns.str.lower()
-        
-        # Rename 'date' column if needed
-        if 'date' not in df.columns and 'datetime' not in df.columns:
-            df = df.rename(columns={df.columns[0]: 'date'})
-        
-        # ============================================================
-        # CALCULATE ALL INDICATORS
-        # ============================================================
-        
-        # SMA (Simple Moving Average)
-        df['sma50'] = df['close'].rolling(window=50).mean()
-        df['sma200'] = df['close'].rolling(window=200).mean()
-        
-        # RSI (Relative Strength Index)
-        delta = df['close'].diff()
-        gain = delta.where(delta > 0, 0).rolling(window=14).mean()
-        loss = (-delta.where(delta < 0, 0)).rolling(window=14).mean()
-        rs = gain / loss.replace(0, float('nan'))
-        df['rsi14'] = 100 - (100 / (1 + rs))
-        
-        # MACD (Moving Average Convergence Divergence)
-        ema12 = df['close'].ewm(span=12, adjust=False).mean()
-        ema26 = df['close'].ewm(span=26, adjust=False).mean()
-        df['macd'] = ema12 - ema26
-        df['macd_signal'] = df['macd'].ewm(span=9, adjust=False).mean()
-        df['macd_histogram'] = df['macd'] - df['macd_signal']
-        
-        # Bollinger Bands
-        df['bb_middle'] = df['close'].rolling(window=20).mean()
-        bb_std = df['close'].rolling(window=20).std()
-        df['bb_upper'] = df['bb_middle'] + (bb_std * 2)
-        df['bb_lower'] = df['bb_middle'] - (bb_std * 2)
-        
-        # Stochastic Oscillator
-        low14 = df['low'].rolling(window=14).min()
-        high14 = df['high'].rolling(window=14).max()
-        df['stoch_k'] = 100 * ((df['close'] - low14) / (high14 - low14))
-        df['stoch_d'] = df['stoch_k'].rolling(window=3).mean()
-        
-        # ATR (Average True Range)
-        tr1 = df['high'] - df['low']
-        tr2 = (df['high'] - df['close'].shift()).abs()
-        tr3 = (df['low'] - df['close'].shift()).abs()
-        tr = pd.concat([tr1, tr2, tr3], axis=1).max(axis=1)
-        df['atr14'] = tr.rolling(window=14).mean()
-        df['atr_percent'] = (df['atr14'] / df['close']) * 100
-        
-        # OBV (On-Balance Volume)
-        direction = np.sign(df['close'].diff()).fillna(0)
-        df['obv'] = (direction * df['volume']).cumsum()
-        df['obv_sma'] = df['obv'].rolling(window=20).mean()
-        
-        # ADX (Average Directional Index)
-        plus_dm = df['high'].diff()
-        minus_dm = df['low'].shift() - df['low']
-        plus_dm = plus_dm.where((plus_dm > minus_dm) & (plus_dm > 0), 0)
-        minus_dm = minus_dm.where((minus_dm > plus_dm) & (minus_dm > 0), 0)
-        
-        atr14_for_adx = tr.rolling(window=14).mean()
-        plus_di = 100 * (plus_dm.rolling(window=14).mean() / atr14_for_adx)
-        minus_di = 100 * (minus_dm.rolling(window=14).mean() / atr14_for_adx)
-        dx = 100 * (abs(plus_di - minus_di) / (plus_di + minus_di))
-        df['adx'] = dx.rolling(window=14).mean()
-        df['plus_di'] = plus_di
-        df['minus_di'] = minus_di
-        
-        # Volume analysis
-        df['volume_sma20'] = df['volume'].rolling(window=20).mean()
+        # yfinance download and indicator math are blocking, keep them off the event loop
+        df = await asyncio.to_thread(_fetch_history_sync, ticker)
+        if df is None:
+            return None, False
         
         # ============================================================
         # CACHE RAW DATA (1 hour TTL)
         # ============================================================
         
-        # Convert to JSON-serializable format
-        df_for_cache = df.copy()
-        df_for_cache['date'] = df_for_cache['date'].astype(str)
-        cache_data = df_for_cache.to_dict(orient='records')
-        
-        # Cache raw OHLCV + indicators
-        await redis.set(cache_key, json.dumps(cache_data), ex=CacheTTL.TECHNICAL_RAW)
+        # Cache raw OHLCV + indicators as columns (no per-row keys)
+        await _store_raw_history(redis, ticker, df)
         
-        return df
+        return df, True
         
     except Exception as e:
         logger.error(f"Error fetching raw history for {ticker}: {e}", exc_info=True)
-        return None
+        return None, False
+
+
+# signal -> (current field, low, high, (below low, within band, above high))
+_SIGNAL_BANDS = {
+    "bollingerSignal": ("bollingerPosition", 0, 100, ("oversold", "neutral", "overbought")),
+    "stochasticSignal": ("stochasticK", 20, 80, ("oversold", "neutral", "overbought")),
+    "volumeSignal": ("volumeChange", -50, 50, ("low", "normal", "high")),
+    "atrSignal": ("atrPercent", 2, 5, ("low", "normal", "high")),
+}
+
+# ADX trend strength: < 20 no trend, then weak / moderate / strong from each bound up
+_ADX_BOUNDS = (20, 25, 40)
+_ADX_LABELS = ("no-trend", "weak", "moderate", "strong")
 
 
 def generate_technical_signals(current: dict, df: pd.DataFrame) -> dict:
@@ -148,53 +294,10 @@ def generate_technical_signals(current: dict, df: pd.DataFrame) -> dict:
     else:
         signals["macdTrend"] = None
     
-    # Bollinger Signal
-    bb_pos = current.get("bollingerPosition")
-    if bb_pos is not None:
-        if bb_pos > 100:
-            signals["bollingerSignal"] = "overbought"
-        elif bb_pos < 0:
-            signals["bollingerSignal"] = "oversold"
-        else:
-            signals["bollingerSignal"] = "neutral"
-    else:
-        signals["bollingerSignal"] = None
-    
-    # Stochastic Signal
-    stoch_k = current.get("stochasticK")
-    if stoch_k is not None:
-        if stoch_k > 80:
-            signals["stochasticSignal"] = "overbought"
-        elif stoch_k < 20:
-            signals["stochasticSignal"] = "oversold"
-        else:
-            signals["stochasticSignal"] = "neutral"
-    else:
-        signals["stochasticSignal"] = None
-    
-    # Volume Signal
-    vol_change = current.get("volumeChange")
-    if vol_change is not None:
-        if vol_change > 50:
-            signals["volumeSignal"] = "high"
-        elif vol_change < -50:
-            signals["volumeSignal"] = "low"
-        else:
-            signals["volumeSignal"] = "normal"
-    else:
-        signals["volumeSignal"] = None
-    
-    # ATR Signal (volatility)
-    atr_pct = current.get("atrPercent")
-    if atr_pct is not None:
-        if atr_pct > 5:
-            signals["atrSignal"] = "high"
-        elif atr_pct < 2:
-            signals["atrSignal"] = "low"
-        else:
-            signals["atrSignal"] = "normal"
-    else:
-        signals["atrSignal"] = None
+    # Bollinger / Stochastic / Volume / ATR: inclusive band lookups
+    for signal, (field, low, high, labels) in _SIGNAL_BANDS.items():
+        value = current.get(field)
+        signals[signal] = labels[(value >= low) + (value > high)] if value is not None else None
     
     # OBV Trend (compare last value to 20-period SMA)
     obv = current.get("obv")
@@ -235,17 +338,7 @@ def generate_technical_signals(current: dict, df: pd.DataFrame) -> dict:
     
     # ADX Signal (trend strength)
     adx = current.get("adx")
-    if adx is not None:
-        if adx >= 40:
-            signals["adxSignal"] = "strong"
-        elif adx >= 25:
-            signals["adxSignal"] = "moderate"
-        elif adx >= 20:
-            signals["adxSignal"] = "weak"
-        else:
-            signals["adxSignal"] = "no-trend"
-    else:
-        signals["adxSignal"] = None
+    signals["adxSignal"] = _ADX_LABELS[bisect_right(_ADX_BOUNDS, adx)] if adx is not None else None
     
     # ADX Trend direction (+DI vs -DI)
     plus_di = current.get("plusDI")
@@ -295,6 +388,283 @@ def generate_technical_signals(current: dict, df: pd.DataFrame) -> dict:
     return signals
 
 
+def _build_technical_result(df: pd.DataFrame, ticker: str, period: str) -> dict:
+    """
+    Build the API payload for one period from the raw indicator frame:
+    current values, signals, chart histories and Fibonacci levels.
+    """
+    # ============================================================
+    # FILTER DATA BY PERIOD
+    # ============================================================
+    
+    days = _PERIOD_DAYS.get(period, 365)
+    df_filtered = df.tail(days)  # read-only view
+    
+    # ============================================================
+    # GET CURRENT VALUES
+    # ============================================================
+    
+    def safe_float(val):
+        return round(float(val), 4) if pd.notna(val) else None
+    
+    # Round each series once per column; NaN becomes None (JSON null).
+    # The last element of each list is the current value.
+    col = _rounded_columns(df_filtered, _HISTORY_COLUMNS)
+    last = {name: values[-1] for name, values in col.items()}
+    last_close = df_filtered['close'].iat[-1]
+    last_volume = df_filtered['volume'].iat[-1]
+    current_price = float(last_close) if pd.notna(last_close) else None
+    
+    # Current indicator values
+    current = {
+        "ticker": ticker,
+        "currentPrice": current_price,
+        "sma50": last['sma50'],
+        "sma200": last['sma200'],
+        "rsi14": last['rsi14'],
+        "macd": last['macd'],
+        "macdSignal": last['macd_signal'],
+        "macdHistogram": last['macd_histogram'],
+        "bollingerUpper": last['bb_upper'],
+        "bollingerMiddle": last['bb_middle'],
+        "bollingerLower": last['bb_lower'],
+        "stochasticK": last['stoch_k'],
+        "stochasticD": last['stoch_d'],
+        "atr14": last['atr14'],
+        "atrPercent": last['atr_percent'],
+        "obv": last['obv'],
+        "adx": last['adx'],
+        "plusDI": last['plus_di'],
+        "minusDI": last['minus_di'],
+        "currentVolume": int(last_volume) if pd.notna(last_volume) else None,
+        "avgVolume20": last['volume_sma20'],
+    }
+    
+    # Calculate derived values
+    if current["currentPrice"] and current["sma50"]:
+        current["priceVsSma50"] = round(
+            ((current["currentPrice"] - current["sma50"]) / current["sma50"]) * 100, 2
+        )
+    else:
+        current["priceVsSma50"] = None
+        
+    if current["currentPrice"] and current["sma200"]:
+        current["priceVsSma200"] = round(
+            ((current["currentPrice"] - current["sma200"]) / current["sma200"]) * 100, 2
+        )
+    else:
+        current["priceVsSma200"] = None
+    
+    # Bollinger position (0-100, 0=lower band, 100=upper band)
+    if current["bollingerUpper"] and current["bollingerLower"] and current["currentPrice"]:
+        bb_range = current["bollingerUpper"] - current["bollingerLower"]
+        if bb_range > 0:
+            current["bollingerPosition"] = round(
+                ((current["currentPrice"] - current["bollingerLower"]) / bb_range) * 100, 1
+            )
+        else:
+            current["bollingerPosition"] = 50
+    else:
+        current["bollingerPosition"] = None
+    
+    # Volume change vs average
+    if current["currentVolume"] and current["avgVolume20"]:
+        current["volumeChange"] = round(
+            ((current["currentVolume"] - current["avgVolume20"]) / current["avgVolume20"]) * 100, 1
+        )
+    else:
+        current["volumeChange"] = None
+    
+    # ============================================================
+    # GENERATE SIGNALS
+    # ============================================================
+    
+    signals = generate_technical_signals(current, df_filtered)
+    current.update(signals)
+    
+    # ============================================================
+    # BUILD HISTORY ARRAYS FOR CHARTS
+    # ============================================================
+    
+    def format_date(dt):
+        if hasattr(dt, 'isoformat'):
+            return dt.isoformat()
+        return str(dt)
+    
+    dates = [format_date(dt) for dt in df_filtered['date']]
+    prices = col['close']
+    
+    # Price + SMA history
+    price_history = [
+        {"date": date, "price": price, "sma50": sma50, "sma200": sma200}
+        for date, price, sma50, sma200 in zip(dates, prices, col['sma50'], col['sma200'])
+    ]
+    
+    # MACD history
+    macd_history = [
+        {"date": date, "macd": macd, "signal": signal, "histogram": histogram}
+        for date, macd, signal, histogram in zip(
+            dates, col['macd'], col['macd_signal'], col['macd_histogram']
+        )
+    ]
+    
+    # Bollinger history
+    bollinger_history = [
+        {"date": date, "price": price, "upper": upper, "middle": middle, "lower": lower}
+        for date, price, upper, middle, lower in zip(
+            dates, prices, col['bb_upper'], col['bb_middle'], col['bb_lower']
+        )
+    ]
+    
+    # Stochastic history
+    stochastic_history = [
+        {"date": date, "k": k, "d": d}
+        for date, k, d in zip(dates, col['stoch_k'], col['stoch_d'])
+    ]
+    
+    # RSI history
+    rsi_history = [
+        {"date": date, "rsi": rsi}
+        for date, rsi in zip(dates, col['rsi14'])
+    ]
+    
+    # Volume history
+    volumes = [int(vol) if vol == vol else 0 for vol in df_filtered['volume'].tolist()]
+    volume_history = [
+        {
+            "date": date,
+            "volume": vol,
+            "avgVolume": avg_vol,
+            "isAboveAvg": vol > (avg_vol or 0) if avg_vol else False,
+        }
+        for date, vol, avg_vol in zip(dates, volumes, col['volume_sma20'])
+    ]
+    
+    # ATR history
+    atr_history = [
+        {"date": date, "atr": atr, "atrPercent": atr_pct}
+        for date, atr, atr_pct in zip(dates, col['atr14'], col['atr_percent'])
+    ]
+    
+    # OBV history
+    obv_history = [
+        {"date": date, "obv": obv, "obvSma": obv_sma}
+        for date, obv, obv_sma in zip(dates, col['obv'], col['obv_sma'])
+    ]
+    
+    # ADX history
+    adx_history = [
+        {"date": date, "adx": adx, "plusDI": plus_di, "minusDI": minus_di}
+        for date, adx, plus_di, minus_di in zip(dates, col['adx'], col['plus_di'], col['minus_di'])
+    ]
+    
+    # Fibonacci history (price with levels for chart)
+    fibonacci_history = [
+        {"date": date, "price": price, "high": high, "low": low}
+        for date, price, high, low in zip(dates, prices, col['high'], col['low'])
+    ]
+    
+    # ============================================================
+    # FIBONACCI RETRACEMENT
+    # ============================================================
+    
+    period_high = df_filtered['high'].max()
+    period_low = df_filtered['low'].min()
+    fib_range = period_high - period_low
+    
+    # Standard Fibonacci levels
+    fib_levels = {
+        "0": safe_float(period_low),
+        "236": safe_float(period_low + fib_range * 0.236),
+        "382": safe_float(period_low + fib_range * 0.382),
+        "500": safe_float(period_low + fib_range * 0.5),
+        "618": safe_float(period_low + fib_range * 0.618),
+        "786": safe_float(period_low + fib_range * 0.786),
+        "1000": safe_float(period_high),
+    }
+    
+    # Current price position relative to Fibonacci
+    if fib_range > 0 and current_price:
+        fib_position = ((current_price - period_low) / fib_range) * 100
+    else:
+        fib_position = 50
+    
+    # Determine nearest Fibonacci level
+    fib_level_values = [
+        (0, fib_levels["0"]),
+        (23.6, fib_levels["236"]),
+        (38.2, fib_levels["382"]),
+        (50, fib_levels["500"]),
+        (61.8, fib_levels["618"]),
+        (78.6, fib_levels["786"]),
+        (100, fib_levels["1000"]),
+    ]
+    
+    nearest_fib = None
+    nearest_distance = float('inf')
+    for level_pct, level_price in fib_level_values:
+        if level_price and current_price:
+            distance = abs(current_price - level_price)
+            if distance < nearest_distance:
+                nearest_distance = distance
+                nearest_fib = level_pct
+    
+    # ============================================================
+    # BUILD RESULT
+    # ============================================================
+    
+    result = {
+        **current,
+        "priceHistory": price_history,
+        "macdHistory": macd_history,
+        "bollingerHistory": bollinger_history,
+        "stochasticHistory": stochastic_history,
+        "rsiHistory": rsi_history,
+        "volumeHistory": volume_history,
+        "atrHistory": atr_history,
+        "obvHistory": obv_history,
+        "adxHistory": adx_history,
+        "fibonacciLevels": fib_levels,
+        "fibonacciPosition": safe_float(fib_position),
+        "nearestFibLevel": nearest_fib,
+        "periodHigh": safe_float(period_high),
+        "periodLow": safe_float(period_low),
+        "fibonacciHistory": fibonacci_history,
+        "lastUpdated": str(pd.Timestamp.now()),
+    }
+    
+    return result
+
+
+async def _prebuild_periods(redis, ticker: str, df: pd.DataFrame, served: str) -> None:
+    """Background: cache every other period of a fresh L1 frame; failures only log."""
+    try:
+        for period in _PERIOD_DAYS:
+            if period == served:
+                continue
+            prebuilt = await asyncio.to_thread(_build_technical_result, df, ticker, period)
+            await redis.set(f"technical:{ticker}:{period}", orjson.dumps(prebuilt), ex=CacheTTL.TECHNICAL_RAW)
+    except Exception as e:
+        logger.warning(f"Background technical prebuild failed for {ticker}: {e}")
+
+
+async def _build_and_cache_result(redis, ticker: str, period: str, df: pd.DataFrame, fresh: bool) -> dict:
+    """Build the L2 payload for one period from an L1 frame and cache it."""
+    result = await asyncio.to_thread(_build_technical_result, df, ticker, period)
+    
+    if fresh:
+        # New L1 frame: the result lives as long as the frame, and the other
+        # periods are prebuilt in the background rather than in this request
+        await redis.set(f"technical:{ticker}:{period}", orjson.dumps(result), ex=CacheTTL.TECHNICAL_RAW)
+        task = asyncio.create_task(_prebuild_periods(redis, ticker, df, period))
+        _prebuild_tasks.add(task)
+        task.add_done_callback(_prebuild_tasks.discard)
+    else:
+        # L1 hit: cache for 5 minutes
+        await redis.set(f"technical:{ticker}:{period}", orjson.dumps(result), ex=CacheTTL.TECHNICAL_SIGNALS)
+    return result
+
+
 async def get_technical_indicators(redis, ticker: str, period: str = "1y") -> Optional[dict]:
     """
     Calculate technical indicators for a stock.
@@ -302,7 +672,10 @@ async def get_technical_indicators(redis, ticker: str, period: str = "1y") -> Op
     
     Uses 2-layer caching:
     - L1: Raw 2y history with indicators (1 hour TTL) - saves yfinance calls
-    - L2: Filtered result per period (5 min TTL) - fast response
+    - L2: Filtered result per period - fast response. Prebuilt for all
+      periods whenever L1 is refetched (1 hour TTL, expires with L1; periods
+      other than the requested one in a background task), otherwise built on
+      demand from L1 (5 min TTL)
     
     Indicators:
     - SMA (50, 200)
@@ -318,287 +691,95 @@ async def get_technical_indicators(redis, ticker: str, period: str = "1y") -> Op
     cache_key = f"technical:{ticker}:{period}"
     cached = await redis.get(cache_key)
     if cached:
-        return json.loads(cached)
+        return orjson.loads(cached)
 
     try:
         # L1 Cache: Get raw data with all indicators (may be cached)
-        df = await get_raw_history_with_indicators(redis, ticker)
+        df, fresh = await _load_raw_history(redis, ticker)
         
         if df is None or len(df) < 50:
             return None
         
-        # ============================================================
-        # FILTER DATA BY PERIOD
-        # ============================================================
-        
-        period_days = {
-            "1w": 7,
-            "1mo": 30,
-            "3mo": 90,
-            "6mo": 180,
-            "1y": 365,
-            "2y": 730,
-        }
-        days = period_days.get(period, 365)
-        df_filtered = df.tail(days).copy()
-        
-        # ============================================================
-        # GET CURRENT VALUES
-        # ============================================================
-        
-        last = df_filtered.iloc[-1]
-        current_price = float(last['close']) if pd.notna(last['close']) else None
-        
-        def safe_float(val):
-            return round(float(val), 4) if pd.notna(val) else None
-        
-        # Current indicator values
-        current = {
-            "ticker": ticker,
-            "currentPrice": current_price,
-            "sma50": safe_float(last['sma50']),
-            "sma200": safe_float(last['sma200']),
-            "rsi14": safe_float(last['rsi14']),
-            "macd": safe_float(last['macd']),
-            "macdSignal": safe_float(last['macd_signal']),
-            "macdHistogram": safe_float(last['macd_histogram']),
-            "bollingerUpper": safe_float(last['bb_upper']),
-            "bollingerMiddle": safe_float(last['bb_middle']),
-            "bollingerLower": safe_float(last['bb_lower']),
-            "stochasticK": safe_float(last['stoch_k']),
-            "stochasticD": safe_float(last['stoch_d']),
-            "atr14": safe_float(last['atr14']),
-            "atrPercent": safe_float(last['atr_percent']),
-            "obv": safe_float(last['obv']),
-            "adx": safe_float(last['adx']),
-            "plusDI": safe_float(last['plus_di']),
-            "minusDI": safe_float(last['minus_di']),
-            "currentVolume": int(last['volume']) if pd.notna(last['volume']) else None,
-            "avgVolume20": safe_float(last['volume_sma20']),
-        }
-        
-        # Calculate derived values
-        if current["currentPrice"] and current["sma50"]:
-            current["priceVsSma50"] = round(
-                ((current["currentPrice"] - current["sma50"]) / current["sma50"]) * 100, 2
-            )
-        else:
-            current["priceVsSma50"] = None
-            
-        if current["currentPrice"] and current["sma200"]:
-            current["priceVsSma200"] = round(
-                ((current["currentPrice"] - current["sma200"]) / current["sma200"]) * 100, 2
-            )
-        else:
-            current["priceVsSma200"] = None
-        
-        # Bollinger position (0-100, 0=lower band, 100=upper band)
-        if current["bollingerUpper"] and current["bollingerLower"] and current["currentPrice"]:
-            bb_range = current["bollingerUpper"] - current["bollingerLower"]
-            if bb_range > 0:
-                current["bollingerPosition"] = round(
-                    ((current["currentPrice"] - current["bollingerLower"]) / bb_range) * 100, 1
-                )
-            else:
-                current["bollingerPosition"] = 50
-        else:
-            current["bollingerPosition"] = None
-        
-        # Volume change vs average
-        if current["currentVolume"] and current["avgVolume20"]:
-            current["volumeChange"] = round(
-                ((current["currentVolume"] - current["avgVolume20"]) / current["avgVolume20"]) * 100, 1
-            )
-        else:
-            current["volumeChange"] = None
-        
-        # ============================================================
-        # GENERATE SIGNALS
-        # ============================================================
-        
-        signals = generate_technical_signals(current, df_filtered)
-        current.update(signals)
-        
-        # ============================================================
-        # BUILD HISTORY ARRAYS FOR CHARTS
-        # ============================================================
-        
-        def format_date(dt):
-            if hasattr(dt, 'isoformat'):
-                return dt.isoformat()
-            return str(dt)
-        
-        # Price + SMA history
-        price_history = []
-        for _, row in df_filtered.iterrows():
-            price_history.append({
-                "date": format_date(row['date']),
-                "price": safe_float(row['close']),
-                "sma50": safe_float(row['sma50']),
-                "sma200": safe_float(row['sma200']),
-            })
-        
-        # MACD history
-        macd_history = []
-        for _, row in df_filtered.iterrows():
-            macd_history.append({
-                "date": format_date(row['date']),
-                "macd": safe_float(row['macd']),
-                "signal": safe_float(row['macd_signal']),
-                "histogram": safe_float(row['macd_histogram']),
-            })
-        
-        # Bollinger history
-        bollinger_history = []
-        for _, row in df_filtered.iterrows():
-            bollinger_history.append({
-                "date": format_date(row['date']),
-                "price": safe_float(row['close']),
-                "upper": safe_float(row['bb_upper']),
-                "middle": safe_float(row['bb_middle']),
-                "lower": safe_float(row['bb_lower']),
-            })
-        
-        # Stochastic history
-        stochastic_history = []
-        for _, row in df_filtered.iterrows():
-            stochastic_history.append({
-                "date": format_date(row['date']),
-                "k": safe_float(row['stoch_k']),
-                "d": safe_float(row['stoch_d']),
-            })
-        
-        # RSI history
-        rsi_history = []
-        for _, row in df_filtered.iterrows():
-            rsi_history.append({
-                "date": format_date(row['date']),
-                "rsi": safe_float(row['rsi14']),
-            })
-        
-        # Volume history
-        volume_history = []
-        for _, row in df_filtered.iterrows():
-            avg_vol = safe_float(row['volume_sma20'])
-            vol = int(row['volume']) if pd.notna(row['volume']) else 0
-            volume_history.append({
-                "date": format_date(row['date']),
-                "volume": vol,
-                "avgVolume": avg_vol,
-                "isAboveAvg": vol > (avg_vol or 0) if avg_vol else False,
-            })
-        
-        # ATR history
-        atr_history = []
-        for _, row in df_filtered.iterrows():
-            atr_history.append({
-                "date": format_date(row['date']),
-                "atr": safe_float(row['atr14']),
-                "atrPercent": safe_float(row['atr_percent']),
-            })
-        
-        # OBV history
-        obv_history = []
-        for _, row in df_filtered.iterrows():
-            obv_history.append({
-                "date": format_date(row['date']),
-                "obv": safe_float(row['obv']),
-                "obvSma": safe_float(row['obv_sma']),
-            })
-        
-        # ADX history
-        adx_history = []
-        for _, row in df_filtered.iterrows():
-            adx_history.append({
-                "date": format_date(row['date']),
-                "adx": safe_float(row['adx']),
-                "plusDI": safe_float(row['plus_di']),
-                "minusDI": safe_float(row['minus_di']),
-            })
-        
-        # ============================================================
-        # FIBONACCI RETRACEMENT
-        # ============================================================
-        
-        period_high = df_filtered['high'].max()
-        period_low = df_filtered['low'].min()
-        fib_range = period_high - period_low
-        
-        # Standard Fibonacci levels
-        fib_levels = {
-            "0": safe_float(period_low),
-            "236": safe_float(period_low + fib_range * 0.236),
-            "382": safe_float(period_low + fib_range * 0.382),
-            "500": safe_float(period_low + fib_range * 0.5),
-            "618": safe_float(period_low + fib_range * 0.618),
-            "786": safe_float(period_low + fib_range * 0.786),
-            "1000": safe_float(period_high),
-        }
-        
-        # Current price position relative to Fibonacci
-        if fib_range > 0 and current_price:
-            fib_position = ((current_price - period_low) / fib_range) * 100
-        else:
-            fib_position = 50
-        
-        # Determine nearest Fibonacci level
-        fib_level_values = [
-            (0, fib_levels["0"]),
-            (23.6, fib_levels["236"]),
-            (38.2, fib_levels["382"]),
-            (50, fib_levels["500"]),
-            (61.8, fib_levels["618"]),
-            (78.6, fib_levels["786"]),
-            (100, fib_levels["1000"]),
-        ]
-        
-        nearest_fib = None
-        nearest_distance = float('inf')
-        for level_pct, level_price in fib_level_values:
-            if level_price and current_price:
-                distance = abs(current_price - level_price)
-                if distance < nearest_distance:
-                    nearest_distance = distance
-                    nearest_fib = level_pct
-        
-        # Fibonacci history (price with levels for chart)
-        fibonacci_history = []
-        for _, row in df_filtered.iterrows():
-            fibonacci_history.append({
-                "date": format_date(row['date']),
-                "price": safe_float(row['close']),
-                "high": safe_float(row['high']),
-                "low": safe_float(row['low']),
-            })
-        
-        # ============================================================
-        # BUILD RESULT
-        # ============================================================
-        
-        result = {
-            **current,
-            "priceHistory": price_history,
-            "macdHistory": macd_history,
-            "bollingerHistory": bollinger_history,
-            "stochasticHistory": stochastic_history,
-            "rsiHistory": rsi_history,
-            "volumeHistory": volume_history,
-            "atrHistory": atr_history,
-            "obvHistory": obv_history,
-            "adxHistory": adx_history,
-            "fibonacciLevels": fib_levels,
-            "fibonacciPosition": safe_float(fib_position),
-            "nearestFibLevel": nearest_fib,
-            "periodHigh": safe_float(period_high),
-            "periodLow": safe_float(period_low),
-            "fibonacciHistory": fibonacci_history,
-            "lastUpdated": str(pd.Timestamp.now()),
-        }
-        
-        # Cache for 5 minutes
-        await redis.set(cache_key, json.dumps(result), ex=CacheTTL.TECHNICAL_SIGNALS)
-        return result
+        return await _build_and_cache_result(redis, ticker, period, df, fresh)
         
     except Exception as e:
         logger.error(f"Error calculating technical indicators for {ticker}: {e}", exc_info=True)
         return None
+
+
+async def get_technical_indicators_batch(
+    redis,
+    tickers: List[str],
+    period: str = "1y",
+) -> Dict[str, Optional[dict]]:
+    """
+    Technical indicators for several tickers (same payload as get_technical_indicators).
+    L2 and L1 are read with one MGET each; raw history for all L1 misses
+    is downloaded in a single yf.download batch request.
+    """
+    unique_tickers = list(dict.fromkeys(t for t in tickers if t))
+    if not unique_tickers:
+        return {}
+    
+    # A Redis or decode error only costs the affected tickers their cache hit
+    results: Dict[str, Optional[dict]] = {}
+    missing: List[str] = []
+    try:
+        cached = await redis.mget([f"technical:{t}:{period}" for t in unique_tickers])
+    except Exception as e:
+        logger.warning(f"Technical L2 batch read failed: {e}")
+        cached = [None] * len(unique_tickers)
+    for ticker, entry in zip(unique_tickers, cached):
+        try:
+            results[ticker] = orjson.loads(entry) if entry else None
+        except orjson.JSONDecodeError as e:
+            logger.warning(f"Ignoring unreadable technical cache for {ticker}: {e}")
+            results[ticker] = None
+        if results[ticker] is None:
+            missing.append(ticker)
+    
+    if missing:
+        frames: Dict[str, Tuple[pd.DataFrame, bool]] = {}
+        to_download: List[str] = []
+        try:
+            raw = await redis.mget([f"raw_technical:{t}" for t in missing])
+        except Exception as e:
+            logger.warning(f"Technical L1 batch read failed: {e}")
+            raw = [None] * len(missing)
+        for ticker, entry in zip(missing, raw):
+            try:
+                df = _decode_raw_history(ticker, entry) if entry else None
+            except Exception as e:
+                logger.warning(f"Ignoring unreadable raw technical cache for {ticker}: {e}")
+                df = None
+            if df is not None:
+                frames[ticker] = (df, False)
+            else:
+                to_download.append(ticker)
+        
+        if to_download:
+            try:
+                downloaded = await asyncio.to_thread(_download_histories_sync, to_download)
+            except Exception as e:
+                logger.error(f"Error in yf.download technical batch for {to_download}: {e}")
+                downloaded = {}
+            for ticker, df in downloaded.items():
+                try:
+                    await _store_raw_history(redis, ticker, df)
+                except Exception as e:
+                    # Still serve the downloaded frame, it just isn't cached
+                    logger.warning(f"Error caching raw technical history for {ticker}: {e}")
+                frames[ticker] = (df, True)
+        
+        for ticker in missing:
+            if ticker not in frames or len(frames[ticker][0]) < 50:
+                results[ticker] = None
+                continue
+            df, fresh = frames[ticker]
+            try:
+                results[ticker] = await _build_and_cache_result(redis, ticker, period, df, fresh)
+            except Exception as e:
+                logger.error(f"Error calculating technical indicators for {ticker}: {e}", exc_info=True)
+                results[ticker] = None
+    
+    return {ticker: results[ticker] for ticker in unique_tickers}
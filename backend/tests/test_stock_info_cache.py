@@ -0,0 +1,207 @@
+import asyncio
+import json
+import threading
+import time
+
+import pytest
+
+from app.services.market import stock_info
+
+
+@pytest.fixture(autouse=True)
+def _clear_local_cache():
+    stock_info._local_cache.clear()
+    yield
+    stock_info._local_cache.clear()
+
+
+class _FakeRedis:
+    def __init__(self) -> None:
+        self.store: dict[str, bytes] = {}
+        self.ttl: dict[str, int | None] = {}
+
+    async def get(self, key: str):
+        return self.store.get(key)
+
+    async def set(self, key: str, value, ex: int | None = None, nx: bool = False) -> None:
+        if nx and key in self.store:
+            return
+        self.store[key] = value.encode() if isinstance(value, str) else value
+        self.ttl[key] = ex
+
+
+_INFO = {
+    "longName": "Example Corp",
+    "sector": "Technology",
+    "industry": "Software—Application",
+    "currency": "USD",
+    "regularMarketPrice": 100.0,
+    "trailingEps": 5.0,
+    "marketCap": 50e9,
+}
+
+
+def _patch_upstream(monkeypatch, info: dict = _INFO) -> list[str]:
+    calls: list[str] = []
+    lock = threading.Lock()
+
+    def fake_fetch(ticker: str) -> dict:
+        with lock:
+            calls.append(ticker)
+        threading.Event().wait(0.05)
+        return dict(info)
+
+    async def no_history(redis, ticker: str):
+        return None
+
+    monkeypatch.setattr(stock_info, "_fetch_info_sync", fake_fetch)
+    monkeypatch.setattr(stock_info, "get_historical_financials", no_history)
+    return calls
+
+
+async def test_concurrent_misses_share_one_upstream_fetch(monkeypatch) -> None:
+    calls = _patch_upstream(monkeypatch)
+    redis = _FakeRedis()
+
+    results = await asyncio.gather(
+        *(stock_info.get_stock_info(redis, "EXM") for _ in range(5))
+    )
+
+    assert calls == ["EXM"]
+    assert all(r is not None and r["symbol"] == "EXM" for r in results)
+    assert json.loads(redis.store["stock_info:EXM"])["data"]["name"] == "Example Corp"
+    assert stock_info._inflight == {}
+
+
+async def test_cancelled_caller_does_not_abort_the_shared_fetch(monkeypatch) -> None:
+    calls = _patch_upstream(monkeypatch)
+    redis = _FakeRedis()
+
+    first = asyncio.create_task(stock_info.get_stock_info(redis, "EXM"))
+    await asyncio.sleep(0)
+    second = asyncio.create_task(stock_info.get_stock_info(redis, "EXM"))
+    await asyncio.sleep(0)
+    first.cancel()
+    result = await second
+
+    assert first.cancelled()
+    assert result["symbol"] == "EXM"
+    assert calls == ["EXM"]
+    assert stock_info._inflight == {}
+
+
+async def test_stale_entry_is_served_and_refreshed_in_background(monkeypatch) -> None:
+    calls = _patch_upstream(monkeypatch)
+    redis = _FakeRedis()
+    stale = {"data": {"symbol": "EXM", "name": "Old Name"}, "fetched_at": 0}
+    redis.store["stock_info:EXM"] = json.dumps(stale).encode()
+
+    result = await stock_info.get_stock_info(redis, "EXM")
+
+    assert result == {"symbol": "EXM", "name": "Old Name"}
+    await asyncio.gather(*stock_info._refresh_tasks)
+    assert calls == ["EXM"]
+    assert json.loads(redis.store["stock_info:EXM"])["data"]["name"] == "Example Corp"
+
+
+async def test_recent_payload_is_served_without_redis(monkeypatch) -> None:
+    calls = _patch_upstream(monkeypatch)
+    redis = _FakeRedis()
+
+    first = await stock_info.get_stock_info(redis, "EXM")
+    redis.store.clear()
+    second = await stock_info.get_stock_info(redis, "EXM")
+
+    assert calls == ["EXM"]
+    assert second == first
+    assert second is not first
+
+
+async def test_callers_cannot_mutate_the_local_cache(monkeypatch) -> None:
+    _patch_upstream(monkeypatch)
+    redis = _FakeRedis()
+
+    first = await stock_info.get_stock_info(redis, "EXM")
+    first["name"] = "Mutated"
+    second = await stock_info.get_stock_info(redis, "EXM")
+    second["symbol"] = "XXX"
+    third = await stock_info.get_stock_info(redis, "EXM")
+
+    assert third["name"] == "Example Corp"
+    assert third["symbol"] == "EXM"
+
+
+async def test_expired_local_entry_falls_back_to_redis(monkeypatch) -> None:
+    _patch_upstream(monkeypatch)
+    redis = _FakeRedis()
+    stock_info._local_cache["EXM"] = (time.monotonic() - 1, {"symbol": "EXM", "name": "Expired"})
+    fresh = {"data": {"symbol": "EXM", "name": "From Redis"}, "fetched_at": time.time()}
+    redis.store["stock_info:EXM"] = json.dumps(fresh).encode()
+
+    result = await stock_info.get_stock_info(redis, "EXM")
+
+    assert result["name"] == "From Redis"
+
+
+async def test_cached_payload_drops_tooltips_and_reads_restore_them(monkeypatch) -> None:
+    _patch_upstream(monkeypatch)
+    redis = _FakeRedis()
+
+    fetched = await stock_info.get_stock_info(redis, "EXM")
+    stored = json.loads(redis.store["stock_info:EXM"])["data"]
+    stock_info._local_cache.clear()
+    read_back = await stock_info.get_stock_info(redis, "EXM")
+
+    assert fetched["valuation"]["models"]
+    assert all("tooltip" not in model for model in stored["valuation"]["models"])
+    assert read_back["valuation"] == fetched["valuation"]
+
+
+async def test_freshness_and_expiry_are_jittered_around_the_ttls(monkeypatch) -> None:
+    _patch_upstream(monkeypatch)
+    redis = _FakeRedis()
+
+    await stock_info.get_stock_info(redis, "EXM")
+    entry = json.loads(redis.store["stock_info:EXM"])
+
+    fresh_for = entry["stale_at"] - entry["fetched_at"]
+    assert 0.9 * stock_info.CacheTTL.STOCK_INFO <= fresh_for <= 1.1 * stock_info.CacheTTL.STOCK_INFO
+    ex = redis.ttl["stock_info:EXM"]
+    assert 0.9 * stock_info.CacheTTL.STOCK_INFO_STALE <= ex <= 1.1 * stock_info.CacheTTL.STOCK_INFO_STALE
+
+
+async def test_entry_is_fresh_until_its_own_stale_at(monkeypatch) -> None:
+    calls = _patch_upstream(monkeypatch)
+    redis = _FakeRedis()
+    now = time.time()
+    entry = {"data": {"symbol": "EXM"}, "fetched_at": now - 10_000, "stale_at": now + 60}
+    redis.store["stock_info:EXM"] = json.dumps(entry).encode()
+
+    await stock_info.get_stock_info(redis, "EXM")
+
+    assert stock_info._refresh_tasks == set()
+    assert calls == []
+
+
+async def test_unknown_ticker_is_negatively_cached(monkeypatch) -> None:
+    calls = _patch_upstream(monkeypatch, info={"longName": "No Price"})
+    redis = _FakeRedis()
+
+    first = await stock_info.get_stock_info(redis, "NOPE")
+    second = await stock_info.get_stock_info(redis, "NOPE")
+
+    assert first is None and second is None
+    assert calls == ["NOPE"]
+    assert redis.ttl["stock_info:NOPE"] == stock_info.CacheTTL.STOCK_INFO_NOT_FOUND
+
+
+async def test_refresh_without_price_keeps_the_stale_entry(monkeypatch) -> None:
+    _patch_upstream(monkeypatch, info={"longName": "No Price"})
+    redis = _FakeRedis()
+    stale = {"data": {"symbol": "EXM", "name": "Old Name"}, "fetched_at": 0}
+    redis.store["stock_info:EXM"] = json.dumps(stale).encode()
+
+    await stock_info.get_stock_info(redis, "EXM")
+    await asyncio.gather(*stock_info._refresh_tasks)
+
+    assert json.loads(redis.store["stock_info:EXM"])["data"]["name"] == "Old Name"
@@ -90,3 +90,14 @@ def test_ltm_negative_fcf_suppresses_consistent_fcf_positive() -> None:
     assert "Konzistentní FCF" not in titles
     assert "Historicky pozitivní FCF, LTM záporný" in titles
     assert "Záporný cash flow" in titles
+
+
+def test_payload_without_metrics_only_gets_historical_insights() -> None:
+    historical = {
+        "years": ["FY 2022", "FY 2023", "FY 2024", "FY 2025", "LTM", "5Y Avg"],
+        "context": {"free_cashflow": [19900000, 7500000, 32900000, 31300000, -10875000, None]},
+    }
+
+    assert generate_insights({"sector": "Energy"}) == ()
+    assert generate_insights({}, historical=historical) == generate_insights({"sector": "Energy"}, historical=historical)
+    assert generate_insights({"sector": "Energy"}, historical=historical)
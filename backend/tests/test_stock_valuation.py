@@ -0,0 +1,25 @@
+from app.services.market import stock_info
+from app.services.market.stock_info import _forward_peg_valuation, calculate_valuation
+
+
+def test_composite_skips_models_without_fair_value(monkeypatch) -> None:
+    def model(fair_value, confidence):
+        return (lambda data: {"fairValue": fair_value, "confidence": confidence, "inputs": {}}), ()
+
+    monkeypatch.setattr(
+        stock_info,
+        "_VALUATION_MODELS",
+        (model(90.0, "high"), model(None, "high"), model(60.0, "low")),
+    )
+
+    result = calculate_valuation({"price": 80.0})
+
+    assert result["composite"]["fairValue"] == 82.5
+    assert result["composite"]["modelsUsed"] == 2
+
+
+def test_forward_peg_raises_fast_growing_financials_to_medium_confidence() -> None:
+    turnaround = {"eps": 1.0, "forwardEps": 2.0, "price": 40.0}
+
+    assert _forward_peg_valuation({**turnaround, "sector": "Technology"})["confidence"] == "low"
+    assert _forward_peg_valuation({**turnaround, "sector": "Financial Services"})["confidence"] == "medium"
@@ -0,0 +1,159 @@
+import asyncio
+import json
+
+import numpy as np
+import pandas as pd
+
+from app.core.cache import CacheTTL
+from app.services.market import technical
+
+
+class _FakeRedis:
+    def __init__(self) -> None:
+        self.store: dict[str, bytes] = {}
+        self.ttl: dict[str, int | None] = {}
+
+    async def get(self, key: str):
+        return self.store.get(key)
+
+    async def mget(self, keys: list[str]):
+        return [self.store.get(k) for k in keys]
+
+    async def set(self, key: str, value, ex: int | None = None) -> None:
+        self.store[key] = value.encode() if isinstance(value, str) else value
+        self.ttl[key] = ex
+
+
+def _history(days: int = 260) -> pd.DataFrame:
+    rng = np.random.default_rng(7)
+    close = 100 * np.exp(np.cumsum(rng.normal(0, 0.02, days)))
+    index = pd.date_range("2024-01-02", periods=days, freq="B", tz="America/New_York", name="Date")
+    return pd.DataFrame(
+        {
+            "Open": close,
+            "High": close * 1.01,
+            "Low": close * 0.99,
+            "Close": close,
+            "Volume": rng.integers(100_000, 1_000_000, days),
+        },
+        index=index,
+    )
+
+
+def _patch_yfinance(monkeypatch) -> list[str]:
+    calls: list[str] = []
+
+    class _Ticker:
+        def __init__(self, ticker: str) -> None:
+            calls.append(ticker)
+
+        def history(self, **kwargs) -> pd.DataFrame:
+            return _history()
+
+    monkeypatch.setattr(technical.yf, "Ticker", _Ticker)
+    return calls
+
+
+async def test_raw_history_cache_roundtrip_keeps_values_and_gaps(monkeypatch) -> None:
+    calls = _patch_yfinance(monkeypatch)
+    redis = _FakeRedis()
+
+    fresh = await technical.get_raw_history_with_indicators(redis, "AAPL")
+    cached = await technical.get_raw_history_with_indicators(redis, "AAPL")
+
+    assert calls == ["AAPL"]
+    assert list(cached.columns) == list(fresh.columns)
+    assert str(cached["date"].dt.tz) == "UTC"
+    assert (cached["date"] == fresh["date"]).all()
+    assert np.isnan(cached["sma200"].iloc[0])
+    for col in fresh.columns.drop("date"):
+        np.testing.assert_array_equal(cached[col].to_numpy(dtype=float), fresh[col].to_numpy(dtype=float))
+
+
+async def test_legacy_raw_history_entry_is_refetched(monkeypatch) -> None:
+    calls = _patch_yfinance(monkeypatch)
+    redis = _FakeRedis()
+    redis.store["raw_technical:AAPL"] = json.dumps([{"date": "2024-01-02", "close": float("nan")}]).encode()
+
+    df = await technical.get_raw_history_with_indicators(redis, "AAPL")
+
+    assert calls == ["AAPL"]
+    assert len(df) == 260
+
+
+async def test_fresh_frame_prebuilds_every_period_for_the_l1_lifetime(monkeypatch) -> None:
+    _patch_yfinance(monkeypatch)
+    redis = _FakeRedis()
+
+    result = await technical.get_technical_indicators(redis, "AAPL", "3mo")
+
+    assert len(result["priceHistory"]) == 90
+    assert "technical:AAPL:1y" not in redis.store
+    await asyncio.gather(*technical._prebuild_tasks)
+    for period in ("1w", "1mo", "3mo", "6mo", "1y", "2y"):
+        assert redis.ttl[f"technical:AAPL:{period}"] == CacheTTL.TECHNICAL_RAW
+    assert len((await technical.get_technical_indicators(redis, "AAPL", "1w"))["priceHistory"]) == 7
+
+
+async def test_l1_hit_builds_only_the_requested_period(monkeypatch) -> None:
+    calls = _patch_yfinance(monkeypatch)
+    redis = _FakeRedis()
+    await technical.get_raw_history_with_indicators(redis, "AAPL")
+
+    await technical.get_technical_indicators(redis, "AAPL", "6mo")
+
+    assert calls == ["AAPL"]
+    assert redis.ttl["technical:AAPL:6mo"] == CacheTTL.TECHNICAL_SIGNALS
+    assert "technical:AAPL:1y" not in redis.store
+
+
+async def test_batch_downloads_all_raw_misses_in_one_request(monkeypatch) -> None:
+    calls = _patch_yfinance(monkeypatch)
+    downloads: list[str] = []
+
+    def fake_download(tickers: str, **kwargs) -> pd.DataFrame:
+        downloads.append(tickers)
+        frames = {"MSFT": _history(), "NEW": _history(30)}
+        return pd.concat(frames, axis=1).swaplevel(axis=1)
+
+    monkeypatch.setattr(technical.yf, "download", fake_download)
+    redis = _FakeRedis()
+    single = await technical.get_technical_indicators(redis, "AAPL", "3mo")
+
+    results = await technical.get_technical_indicators_batch(redis, ["MSFT", "AAPL", "NEW", "MSFT"], "3mo")
+
+    assert calls == ["AAPL"]
+    assert downloads == ["MSFT NEW"]
+    assert list(results) == ["MSFT", "AAPL", "NEW"]
+    assert results["AAPL"] == single
+    assert results["NEW"] is None
+    await asyncio.gather(*technical._prebuild_tasks)
+    msft = results["MSFT"]
+    assert {k: v for k, v in msft.items() if k != "lastUpdated"} == {
+        k: v for k, v in single.items() if k not in ("lastUpdated", "ticker")
+    } | {"ticker": "MSFT"}
+    assert redis.ttl["technical:MSFT:1y"] == CacheTTL.TECHNICAL_RAW
+
+
+async def test_batch_survives_redis_errors(monkeypatch) -> None:
+    _patch_yfinance(monkeypatch)
+    monkeypatch.setattr(
+        technical.yf, "download", lambda tickers, **kwargs: pd.concat({"MSFT": _history()}, axis=1).swaplevel(axis=1)
+    )
+
+    class _BrokenRedis(_FakeRedis):
+        async def mget(self, keys: list[str]):
+            raise ConnectionError("redis down")
+
+        async def set(self, key: str, value, ex: int | None = None) -> None:
+            if key.startswith("raw_technical:"):
+                raise ConnectionError("redis down")
+            await super().set(key, value, ex)
+
+    redis = _BrokenRedis()
+
+    results = await technical.get_technical_indicators_batch(redis, ["MSFT"], "3mo")
+    await asyncio.gather(*technical._prebuild_tasks)
+
+    assert len(results["MSFT"]["priceHistory"]) == 90
+    assert "raw_technical:MSFT" not in redis.store
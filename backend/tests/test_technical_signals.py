@@ -0,0 +1,34 @@
+import pandas as pd
+import pytest
+
+from app.services.market.technical import generate_technical_signals
+
+
+def _signals(**current) -> dict:
+    return generate_technical_signals(current, pd.DataFrame({"close": [], "obv": []}))
+
+
+@pytest.mark.parametrize(
+    ("position", "expected"),
+    [(-0.1, "oversold"), (0, "neutral"), (100, "neutral"), (100.1, "overbought"), (None, None)],
+)
+def test_bollinger_band_edges_are_neutral(position, expected) -> None:
+    assert _signals(bollingerPosition=position)["bollingerSignal"] == expected
+
+
+def test_band_signals_use_their_own_thresholds() -> None:
+    signals = _signals(stochasticK=80, volumeChange=-50.1, atrPercent=5.2)
+
+    assert signals["stochasticSignal"] == "neutral"
+    assert signals["volumeSignal"] == "low"
+    assert signals["atrSignal"] == "high"
+    assert _signals(stochasticK=19.9, atrPercent=2)["stochasticSignal"] == "oversold"
+    assert _signals(atrPercent=2)["atrSignal"] == "normal"
+
+
+@pytest.mark.parametrize(
+    ("adx", "expected"),
+    [(19.99, "no-trend"), (20, "weak"), (25, "moderate"), (39.9, "moderate"), (40, "strong"), (None, None)],
+)
+def test_adx_strength_bounds_are_inclusive(adx, expected) -> None:
+    assert _signals(adx=adx)["adxSignal"] == expected